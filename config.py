@@ -3,6 +3,7 @@
 Configuration file for AutoRevenue Enterprise Intelligence v10.0
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv() # Load environment variables from .env file for local development
@@ -57,23 +58,42 @@ PORTAL_CONFIGS = [
         "url": "https://www.contractsfinder.service.gov.uk/Published/Notices/OCDS/search?pg=1&results_size=50", # Example for first 50, pagination needed
         "keywords_param": "q", # Parameter name for keywords in API if supported, or None
         "api_specific_params": {"stages": "opportunity"}, # Additional params
-        "max_pages_to_scan": 2 # Limit for demo purposes
+        "max_pages_to_scan": 2, # Limit for demo purposes (first run, before a watermark exists)
+        "since_param": "publishedFrom", # Incremental sync: only releases published after the stored watermark
+        "max_incremental_pages": 50, # Safety cap when paging back to the watermark
+        "stream_json": True, # Decode releases one at a time from the response body (flat memory on large pages)
+        "time_budget_seconds": 300 # Optional override of SCANNER_TIME_BUDGET_SECONDS
     },
     {
         "name": "Find a Tender Service (FTS)",
-        "type": "api", # FTS uses an OCDS-like structure but might require different endpoints/auth
-        "url": "https://www.find-tender.service.gov.uk/ mahdollisuuksia/api/v1/releasepackages?page={page_num}&size=20", # Placeholder URL, FTS API details need verification
-        "keywords_param": "searchTerm", # Example
-        "api_specific_params": {},
-        "max_pages_to_scan": 1
+        "type": "api",
+        "url": "https://www.find-tender.service.gov.uk/api/1.0/ocdsReleasePackages", # Cursor-paged via links.next
+        "keywords_param": None, # The release package API has no keyword search
+        "api_specific_params": {"stages": "tender"},
+        "page_size": 100, # Sent as `limit`
+        "max_pages_to_scan": 1, # First run, before a watermark exists
+        "since_param": "updatedFrom", # Incremental sync: only releases updated after the stored watermark
+        "initial_lookback_days": 7, # First run only: how far back updatedFrom starts
+        "max_incremental_pages": 50,
+        "stream_json": True
     },
     # Add more portal configurations here.
-    # Example for a generic local authority (conceptual - would need specific scraper logic)
+    # Example for a generic local authority (selectors are site-specific)
     # {
     #     "name": "Example Local Authority",
     #     "type": "generic_scrape",
-    #     "start_url": "https://www.example-council.gov.uk/tenders",
+    #     "feed_url": "https://www.example-council.gov.uk/tenders/rss", # Optional RSS/Atom feed, read first
+    #     "sitemap_url": "https://www.example-council.gov.uk/sitemap.xml", # Optional sitemap (or sitemap index)
+    #     "discovery_url_pattern": r"/tenders/\d+", # Keep only tender pages from the feed/sitemap
+    #     "start_url": "https://www.example-council.gov.uk/tenders", # Listing page, used if no feed can be read
     #     "link_selector": "a.tender-link", # CSS selector for tender links
+    #     "detail_selectors": { # CSS selectors on the detail page; a string or a list tried in order
+    #         "title": "h1.tender-title",
+    #         "description": ["div.tender-description", "main"],
+    #         "closing_date": "dd.closing-date",
+    #         "value": "dd.contract-value"
+    #     },
+    #     "detail_workers": 3, # Detail pages fetched concurrently (MAX_REQUESTS_PER_HOST still applies)
     #     "robots_txt_url": "https://www.example-council.gov.uk/robots.txt"
     # },
 ]
@@ -104,14 +124,69 @@ EMAIL_SUBJECT_PREFIX = "AutoRevenue Intel: "
 # --- Data Storage & Caching ---
 CACHE_FILE_PATH = "data/cache.json"
 PROCESSED_TENDERS_DB_PATH = "data/processed_tenders.db" # SQLite DB
+# SQLite tuning for the processed tenders DB (WAL journal, see data_acquisition.TenderDatabase)
+SQLITE_SYNCHRONOUS = "NORMAL" # Safe under WAL: a crash can lose the last commits but never corrupts the DB
+SQLITE_CACHE_SIZE_KB = 32768 # Page cache per connection (32 MB)
+SQLITE_MMAP_SIZE_BYTES = 268435456 # Memory-map up to 256 MB of the DB file for reads
+SQLITE_BUSY_TIMEOUT_MS = 30000 # How long a writer waits for another writer's transaction before "database is locked"
+PERSIST_BATCH_SIZE = 100 # Tenders per transaction when a page is streamed (otherwise one transaction per page)
 CACHE_EXPIRY_DAYS = 1 # How long to keep items in URL cache
+ROBOTS_CACHE_FILE_PATH = "data/robots_cache.json" # Parsed robots.txt rules persisted between runs
+ROBOTS_CACHE_TTL_HOURS = 24 # How long a fetched (or 4xx / missing) robots.txt is trusted
+ROBOTS_NEGATIVE_CACHE_TTL_HOURS = 1 # How long a failed robots.txt fetch (network error, 5xx) is remembered
+ROBOTS_PREFETCH_WORKERS = 8 # Concurrent robots.txt fetches at the start of a run
 TENDER_HISTORY_DAYS = 365 # How far back to look for pattern analysis
 
 # --- System Settings ---
 LOG_LEVEL = "INFO" # DEBUG, INFO, WARNING, ERROR
-MAX_CONCURRENT_SCRAPERS = 3 # If implementing concurrency
+MAX_CONCURRENT_SCRAPERS = 3 # Default calls in flight for the async fetch engine (utils.map_bounded)
+MAX_REQUESTS_PER_HOST = 2 # Requests in flight to any one host, across all threads (utils.host_limiter)
+MAX_CONCURRENT_PORTAL_SCANS = 4 # Portal scanners run side by side in run_all_scanners
+SCANNER_TIME_BUDGET_SECONDS = 300 # Wall-clock budget per scanner; override per portal with "time_budget_seconds"
+SCANNER_BUDGET_GRACE_SECONDS = 30 # After budget + grace a scanner that has not stopped is abandoned (partial results kept)
+HEADSHOT_SCAN_WORKERS = 8 # Worker threads for the headshot scan; one task per site and path (per-host caps still apply)
+HEADSHOT_DEAD_PATH_REPROBE_DAYS = 14 # Procurement paths that 404'd are skipped until this old, then probed again
+HEADSHOT_SIMHASH_MAX_DISTANCE = 3 # Pages whose cleaned-text SimHash differs by at most this many bits (of 64) count as near-duplicates
+HEADSHOT_FINGERPRINT_RETENTION_DAYS = 90 # Page fingerprints not seen for this long are forgotten
+HEADSHOT_NLP_BATCH_SIZE = 16 # Cleaned page texts per nlp.pipe call (headshot_agent.BatchedEntityExtractor)
+HEADSHOT_NLP_N_PROCESS = 1 # nlp.pipe worker processes; >1 forks per batch, so it only pays off with large batches (see --benchmark-nlp)
+HEADSHOT_NLP_BATCH_WAIT_SECONDS = 0.25 # How long the extractor waits for a batch to fill before running a partial one
+HEADSHOT_NLP_MODEL = "en_core_web_sm"
+# Only doc.ents is used; NER runs without these. The shared tok2vec only feeds tagger/parser:
+# en_core_web_sm's ner embeds its own (check nlp.pipe_names and --benchmark-nlp after a model upgrade)
+HEADSHOT_NLP_EXCLUDED_PIPES = ["tok2vec", "tagger", "parser", "lemmatizer", "attribute_ruler", "senter"]
 REQUEST_DELAY_SECONDS = 2 # Base delay between requests to the same domain
 MAX_RETRIES = 3 # For network requests
+HTTP_POOL_MAX_HOSTS = 100 # Per-host connection pools kept alive by the shared HTTP client (http_client.py)
+HTTP_POOL_MAXSIZE_PER_HOST = 4 # Keep-alive connections kept open per host
+MAX_RESPONSE_BYTES = 5 * 1024 * 1024 # Bodies larger than this are aborted mid-download (http_client.guarded_download)
+PARSEABLE_CONTENT_TYPES = ( # Anything else (PDF, images, archives, ...) is aborted after the headers; */*+xml and */*+json also pass
+    "text/html", "application/xhtml+xml", "text/plain",
+    "application/json", "application/xml", "text/xml"
+)
+DNS_CACHE_ENABLED = True # Process-wide getaddrinfo cache installed by http_client
+DNS_CACHE_TTL_SECONDS = 300 # How long a successful lookup is reused
+DNS_NEGATIVE_CACHE_TTL_SECONDS = 60 # How long a host that failed to resolve is treated as unresolvable
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 3 # Consecutive connection/DNS failures before a host is skipped for the rest of the run
+CIRCUIT_BREAKER_STATE_FILE = "data/circuit_breaker.json" # Open hosts are probed once at the start of the next run
+CIRCUIT_BREAKER_PROBE_WAIT_SECONDS = 60 # Max wait for another thread's probe of a half-open host
+# HTTP cassette for offline runs and benchmarks: "record" stores every response passing through
+# the shared HTTP client, "replay" serves them back without touching the network. Unset = live.
+HTTP_CASSETTE_MODE = os.getenv("AUTOREVENUE_HTTP_CASSETTE", "").strip().lower()
+HTTP_CASSETTE_DIR = os.getenv("AUTOREVENUE_HTTP_CASSETTE_DIR", "data/http_cassette")
+# Query parameters left out of the cassette key because they change from run to run (incremental sync
+# watermarks and look-back windows). Add a portal's "since_param" here when adding one.
+HTTP_CASSETTE_VOLATILE_PARAMS = ("publishedFrom", "updatedFrom")
+# A replayed run keeps its run state (URL and robots caches, circuit breaker, tender DB and portal
+# watermarks, headshot DB) in a scratch directory, so a replay never changes what the next live run sees.
+HTTP_CASSETTE_STATE_DIR = os.getenv("AUTOREVENUE_HTTP_CASSETTE_STATE_DIR") or (
+    tempfile.mkdtemp(prefix="autorevenue_replay_") if HTTP_CASSETTE_MODE == "replay" else "")
+if HTTP_CASSETTE_MODE == "replay":
+    os.makedirs(HTTP_CASSETTE_STATE_DIR, exist_ok=True)
+    CACHE_FILE_PATH = os.path.join(HTTP_CASSETTE_STATE_DIR, "cache.json")
+    PROCESSED_TENDERS_DB_PATH = os.path.join(HTTP_CASSETTE_STATE_DIR, "processed_tenders.db")
+    ROBOTS_CACHE_FILE_PATH = os.path.join(HTTP_CASSETTE_STATE_DIR, "robots_cache.json")
+    CIRCUIT_BREAKER_STATE_FILE = os.path.join(HTTP_CASSETTE_STATE_DIR, "circuit_breaker.json")
 
 # GitHub Actions specific settings
 GITHUB_WORKSPACE = os.getenv("GITHUB_WORKSPACE", ".")
@@ -6,7 +6,7 @@ Orchestrates data acquisition, analysis, and reporting.
 import logging
 import time
 import os
-from data_acquisition import run_all_scanners
+from data_acquisition import run_all_scanners_with_report
 from intelligence_analyzer import analyze_tenders_for_companies
 from reporting import send_reports
 from config import LOG_LEVEL
@@ -38,7 +38,10 @@ class SystemOrchestrator:
         # 1. Data Acquisition
         logger.info("Phase 1: Acquiring new tender data...")
         try:
-            new_tenders = run_all_scanners()
+            new_tenders, scanner_report = run_all_scanners_with_report()
+            for entry in scanner_report:
+                logger.info(f"  {entry['portal']}: {entry['status']}, {entry['seconds']:.1f}s, "
+                            f"{entry['new']} new / {entry['amended']} amended / {entry['unchanged']} unchanged")
             if not new_tenders:
                 logger.info("No new tenders found in this cycle.")
                 # Optionally, still send a "no updates" report or handle as needed
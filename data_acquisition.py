@@ -3,18 +3,37 @@
 Modules for acquiring procurement opportunity data from various portals.
 """
 import json
+import re
+import asyncio
 import logging
 import datetime
+import hashlib
+import os
 import sqlite3
+import queue
+import threading
+import time
+import xml.etree.ElementTree as ET
+import requests
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from urllib.parse import quote, urljoin
 from bs4 import BeautifulSoup
 
 from config import (
     PORTAL_CONFIGS, CACHE_FILE_PATH, CACHE_EXPIRY_DAYS,
-    USER_AGENT, REQUEST_DELAY_SECONDS, PROCESSED_TENDERS_DB_PATH
+    USER_AGENT, REQUEST_DELAY_SECONDS, PROCESSED_TENDERS_DB_PATH, PERSIST_BATCH_SIZE,
+    SQLITE_SYNCHRONOUS, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE_BYTES, SQLITE_BUSY_TIMEOUT_MS,
+    MAX_CONCURRENT_PORTAL_SCANS, SCANNER_TIME_BUDGET_SECONDS, SCANNER_BUDGET_GRACE_SECONDS,
+    MAX_CONCURRENT_SCRAPERS
 )
-from utils import respectful_request, normalize_text, generate_tender_id
+from utils import (
+    respectful_request, map_bounded, normalize_text, generate_tender_id,
+    StreamingJSONArray,
+    prefetch_robots, save_robots_cache
+)
+from http_client import log_pool_stats, circuit_breaker
 
 logger = logging.getLogger(__name__)
 
@@ -22,9 +41,14 @@ logger = logging.getLogger(__name__)
 # For a production system, consider a more robust caching solution (Redis, memcached)
 # or a proper database for visited URLs and their content hashes.
 _url_cache = {}
+# URLs revalidated during this run -> True if the page was unchanged.
+# Once a URL has been checked in this run, later fetches of it are sent without validators,
+# so a second caller in the same run gets the full body instead of a 304.
+_validated_this_run: Dict[str, bool] = {}
 
 def load_url_cache():
     global _url_cache
+    _validated_this_run.clear()
     try:
         with open(CACHE_FILE_PATH, 'r') as f:
             _url_cache = json.load(f)
@@ -43,8 +67,10 @@ def load_url_cache():
 
 def save_url_cache():
     try:
+        # Snapshot first: an abandoned scanner thread may still be adding entries
+        snapshot = {url: dict(data) for url, data in list(_url_cache.items())}
         with open(CACHE_FILE_PATH, 'w') as f:
-            json.dump(_url_cache, f, indent=4)
+            json.dump(snapshot, f, indent=4)
     except IOError:
         logger.error(f"Could not write to cache file {CACHE_FILE_PATH}")
 
@@ -57,9 +83,151 @@ def is_url_cached_and_unchanged(url: str, current_content_hash: str) -> bool:
         return True
     return False
 
+# --- Conditional GET (ETag / Last-Modified) on top of the URL cache ---
+def get_conditional_headers(url: str) -> Dict[str, str]:
+    """
+    Returns If-None-Match / If-Modified-Since headers built from the validators stored for the URL.
+    """
+    if url in _validated_this_run:
+        return {}
+    cached_data = _url_cache.get(url) or {}
+    headers = {}
+    if cached_data.get("etag"):
+        headers["If-None-Match"] = cached_data["etag"]
+    if cached_data.get("last_modified"):
+        headers["If-Modified-Since"] = cached_data["last_modified"]
+    return headers
+
+def record_response_validators(url: str, response, check_content_hash: bool = True) -> bool:
+    """
+    Stores the response's ETag/Last-Modified and content hash for the URL.
+    Returns True if the page is unchanged since it was last cached: either a 304,
+    or a full response whose body hash matches the cached one (when check_content_hash is set).
+    """
+    if url in _validated_this_run: # Refetched in the same run: keep the first verdict
+        return _validated_this_run[url]
+    entry = _url_cache.setdefault(url, {})
+    entry["timestamp"] = datetime.datetime.now().timestamp()
+    if response.status_code == 304:
+        _validated_this_run[url] = True
+        return True
+
+    if check_content_hash:
+        content_hash = hashlib.md5(response.content).hexdigest()
+        unchanged = entry.get("hash") == content_hash
+        entry["hash"] = content_hash
+    else: # Streamed body: reading it here would defeat streaming, so rely on the validators alone
+        unchanged = False
+        entry.pop("hash", None)
+    entry["etag"] = response.headers.get("ETag")
+    entry["last_modified"] = response.headers.get("Last-Modified")
+    _validated_this_run[url] = unchanged
+    return unchanged
+
+def forget_url_validators(url: str):
+    """
+    Drops the URL's cached validators and content hash. Used when a page was fetched but what it
+    held could not be stored, so the next run fetches it in full instead of getting a 304.
+    """
+    _url_cache.pop(url, None)
+    _validated_this_run.pop(url, None)
+
+def is_url_unchanged_this_run(url: str) -> bool:
+    """True if the URL was already found unchanged earlier in this run."""
+    return _validated_this_run.get(url, False)
+
+def conditional_request(url: str, **kwargs) -> Tuple[Optional[Any], bool]:
+    """
+    GETs the URL through respectful_request with the stored validators.
+    Returns (response, unchanged). A 304 comes back as (response, True) with no body to parse.
+    With stream=True the body is left unread for the caller, so only ETag/Last-Modified are compared.
+    """
+    headers = dict(kwargs.pop('headers', None) or {})
+    headers.update(get_conditional_headers(url))
+    response = respectful_request("GET", url, headers=headers, **kwargs)
+    if response is None:
+        return None, False
+    return response, record_response_validators(url, response, check_content_hash=not kwargs.get("stream"))
+
 # --- Processed Tenders Database (SQLite) ---
+class TenderDatabase:
+    """
+    Connection manager for the processed tenders DB.
+    The file is switched to WAL once, so readers never block the writer and concurrent writers
+    queue on busy_timeout instead of failing with "database is locked".
+    Each thread gets its own connection; `read_only_connection()` opens a memory-mapped,
+    query-only connection for analysis queries.
+    """
+    def __init__(self, db_path: str = PROCESSED_TENDERS_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._generation = 0 # Bumped by close_all() so threads reopen instead of using a closed connection
+        self._wal_checked = False
+
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}") # Negative value = size in KiB
+        conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE_BYTES}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+    def _enable_wal(self, conn: sqlite3.Connection):
+        # journal_mode is persistent in the DB file, so this only needs to run once per process
+        with self._lock:
+            if self._wal_checked:
+                return
+            journal_mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            if str(journal_mode).lower() != "wal":
+                logger.warning(f"Could not enable WAL on {self.db_path} (journal_mode={journal_mode}).")
+            self._wal_checked = True
+
+    def connection(self) -> sqlite3.Connection:
+        """Returns this thread's read/write connection, opening and tuning it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "generation", None) == self._generation:
+            return conn
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        # check_same_thread=False only so close_all() can close it from the main thread;
+        # the connection itself is never shared between threads.
+        conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        self._enable_wal(conn)
+        self._apply_pragmas(conn)
+        conn.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+        with self._lock:
+            self._connections.append(conn)
+            self._local.generation = self._generation
+        self._local.conn = conn
+        return conn
+
+    def read_only_connection(self) -> sqlite3.Connection:
+        """
+        Opens a new read-only connection (the caller closes it). Reads see the last committed
+        state and never take the write lock, so they can run alongside scanners.
+        """
+        uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+        self._apply_pragmas(conn)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def close_all(self):
+        """Closes every per-thread connection. The last close checkpoints the WAL back into the DB file."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing connection to {self.db_path}: {e}")
+
+tender_db = TenderDatabase()
+
 def init_db():
-    conn = sqlite3.connect(PROCESSED_TENDERS_DB_PATH)
+    conn = tender_db.connection()
     cursor = conn.cursor()
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS tenders (
@@ -74,49 +242,220 @@ def init_db():
             data_json TEXT, -- Store raw JSON data from API if available
             first_seen_date TEXT,
             last_seen_date TEXT,
-            status TEXT DEFAULT 'new' -- e.g., new, processing, reported, archived
+            status TEXT DEFAULT 'new', -- e.g., new, amended, processing, reported, archived
+            content_hash TEXT -- SHA-256 of the normalized tender, see compute_tender_hash
+        )
+    ''')
+    # Migrate DBs created before content_hash existed; their rows get a hash on next sighting
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(tenders)")}
+    if "content_hash" not in columns:
+        cursor.execute("ALTER TABLE tenders ADD COLUMN content_hash TEXT")
+        logger.info("Added content_hash column to tenders table.")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS portal_watermarks (
+            portal TEXT PRIMARY KEY,
+            last_release_date TEXT, -- Newest OCDS release `date` stored for this portal
+            updated_at TEXT
         )
     ''')
     conn.commit()
-    conn.close()
+
+# --- Incremental sync watermarks ---
+def get_portal_watermark(portal_name: str, conn: sqlite3.Connection) -> Optional[str]:
+    cursor = conn.cursor()
+    cursor.execute("SELECT last_release_date FROM portal_watermarks WHERE portal = ?", (portal_name,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def set_portal_watermark(portal_name: str, last_release_date: str, conn: sqlite3.Connection):
+    try:
+        conn.execute("""
+            INSERT INTO portal_watermarks (portal, last_release_date, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(portal) DO UPDATE SET
+                last_release_date=excluded.last_release_date,
+                updated_at=excluded.updated_at
+        """, (portal_name, last_release_date, datetime.datetime.now().isoformat()))
+        conn.commit()
+        logger.info(f"Watermark for {portal_name} advanced to {last_release_date}")
+    except sqlite3.Error as e:
+        logger.error(f"SQLite error storing watermark for {portal_name}: {e}")
+
+def parse_release_date(date_text: Optional[str]) -> Optional[datetime.datetime]:
+    """Parses an OCDS date (ISO 8601, 'Z' or offset) into an aware datetime. Naive values are taken as UTC."""
+    if not date_text:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(date_text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
 
 def is_tender_processed(tender_id: str, conn: sqlite3.Connection) -> bool:
     cursor = conn.cursor()
     cursor.execute("SELECT 1 FROM tenders WHERE id = ?", (tender_id,))
     return cursor.fetchone() is not None
 
+_TENDER_UPSERT_SQL = """
+    INSERT INTO tenders (id, title, url, source, published_date, closing_date, description, value_text, data_json, first_seen_date, last_seen_date, status, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'new', ?)
+    ON CONFLICT(url) DO UPDATE SET
+        title=excluded.title,
+        description=excluded.description,
+        closing_date=excluded.closing_date,
+        value_text=excluded.value_text,
+        data_json=excluded.data_json,
+        last_seen_date=excluded.last_seen_date,
+        content_hash=excluded.content_hash
+"""
+
+# Existing row whose content changed: rewrite it and send it back through analysis
+_TENDER_AMEND_SQL = """
+    UPDATE tenders SET title=?, description=?, closing_date=?, value_text=?, data_json=?,
+        last_seen_date=?, content_hash=?, status='amended'
+    WHERE id=?
+"""
+
+# Existing row stored before content hashes were kept: fill in the hash without flagging a change
+_TENDER_BACKFILL_SQL = """
+    UPDATE tenders SET title=?, description=?, closing_date=?, value_text=?, data_json=?,
+        last_seen_date=?, content_hash=?
+    WHERE id=?
+"""
+
+_TENDER_SEEN_SQL = "UPDATE tenders SET last_seen_date=? WHERE id=?"
+
+def compute_tender_hash(tender_data: Dict[str, Any]) -> str:
+    """
+    Stable SHA-256 of a normalized tender: the parsed fields plus the raw release,
+    serialized with sorted keys so dict ordering in the source JSON does not matter.
+    """
+    normalized = {
+        "title": tender_data.get('title'),
+        "url": tender_data.get('url'),
+        "description": tender_data.get('description'),
+        "published_date": tender_data.get('published_date'),
+        "closing_date": tender_data.get('closing_date'),
+        "value_text": tender_data.get('value_text'),
+        "raw_data": tender_data.get('raw_data') or {}
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")).hexdigest()
+
+def _tender_row(tender_data: Dict[str, Any], now_iso: str) -> Tuple:
+    return (
+        tender_data['id'],
+        tender_data['title'],
+        tender_data['url'],
+        tender_data['source'],
+        tender_data.get('published_date'),
+        tender_data.get('closing_date'),
+        tender_data['description'],
+        tender_data.get('value_text'),
+        json.dumps(tender_data.get('raw_data', {})),
+        now_iso,
+        now_iso,
+        tender_data.get('content_hash') or compute_tender_hash(tender_data)
+    )
+
+def _tender_update_row(tender_data: Dict[str, Any], now_iso: str) -> Tuple:
+    """Parameters for _TENDER_AMEND_SQL / _TENDER_BACKFILL_SQL."""
+    return (
+        tender_data['title'],
+        tender_data['description'],
+        tender_data.get('closing_date'),
+        tender_data.get('value_text'),
+        json.dumps(tender_data.get('raw_data', {})),
+        now_iso,
+        tender_data.get('content_hash') or compute_tender_hash(tender_data),
+        tender_data['id']
+    )
+
 def store_tender_data(tender_data: Dict[str, Any], conn: sqlite3.Connection):
     cursor = conn.cursor()
     now_iso = datetime.datetime.now().isoformat()
     try:
-        cursor.execute("""
-            INSERT INTO tenders (id, title, url, source, published_date, closing_date, description, value_text, data_json, first_seen_date, last_seen_date, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'new')
-            ON CONFLICT(url) DO UPDATE SET
-                title=excluded.title,
-                description=excluded.description,
-                closing_date=excluded.closing_date,
-                value_text=excluded.value_text,
-                data_json=excluded.data_json,
-                last_seen_date=excluded.last_seen_date
-        """, (
-            tender_data['id'],
-            tender_data['title'],
-            tender_data['url'],
-            tender_data['source'],
-            tender_data.get('published_date'),
-            tender_data.get('closing_date'),
-            tender_data['description'],
-            tender_data.get('value_text'),
-            json.dumps(tender_data.get('raw_data', {})),
-            now_iso,
-            now_iso
-        ))
+        cursor.execute(_TENDER_UPSERT_SQL, _tender_row(tender_data, now_iso))
         conn.commit()
         logger.info(f"Stored/Updated tender: {tender_data['id']} from {tender_data['source']}")
     except sqlite3.Error as e:
         logger.error(f"SQLite error storing tender {tender_data['id']}: {e}")
 
+# --- Batched persistence ---
+SQLITE_MAX_QUERY_PARAMS = 900 # Stay below SQLite's default host-parameter limit (999)
+
+def _select_tenders_in(key_column: str, columns: str, keys: Iterable[str], conn: sqlite3.Connection) -> List[tuple]:
+    """Rows of `columns` for tenders whose `key_column` is in `keys`, using one query per 900 keys."""
+    rows: List[tuple] = []
+    keys = list(keys)
+    cursor = conn.cursor()
+    for start in range(0, len(keys), SQLITE_MAX_QUERY_PARAMS):
+        chunk = keys[start:start + SQLITE_MAX_QUERY_PARAMS]
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(f"SELECT {columns} FROM tenders WHERE {key_column} IN ({placeholders})", chunk)
+        rows.extend(cursor.fetchall())
+    return rows
+
+def get_stored_tender_urls(urls: List[str], conn: sqlite3.Connection) -> set:
+    """Returns the subset of `urls` already stored in the tenders table."""
+    return {row[0] for row in _select_tenders_in("url", "url", urls, conn)}
+
+def get_tender_hashes(tender_ids: List[str], conn: sqlite3.Connection) -> Dict[str, Optional[str]]:
+    """Returns {id: content_hash} for the IDs already in the tenders table (hash is None for pre-hash rows)."""
+    return dict(_select_tenders_in("id", "id, content_hash", tender_ids, conn))
+
+def store_tenders_bulk(tenders_data: List[Dict[str, Any]], conn: sqlite3.Connection) -> Dict[str, Any]:
+    """
+    Persists a batch of tenders in a single transaction (one commit/fsync), compared by content hash:
+    new IDs are inserted, changed rows are rewritten and marked 'amended', and unchanged rows
+    only get their last_seen_date bumped.
+    Returns {"rows", "seconds", "rows_per_second", "new", "amended", "unchanged", "changes", "failed"},
+    where "changes" maps each new or amended ID to "new"/"amended" and "failed" is True if the
+    transaction was rolled back (nothing from the batch was stored).
+    """
+    stats = {"rows": 0, "seconds": 0.0, "rows_per_second": 0.0, "new": 0, "amended": 0, "unchanged": 0, "changes": {}, "failed": False}
+    if not tenders_data:
+        return stats
+    now_iso = datetime.datetime.now().isoformat()
+    start = time.perf_counter()
+    new_rows, amended_rows, backfill_rows, seen_rows = [], [], [], []
+    changes: Dict[str, str] = {}
+    try:
+        stored_hashes = get_tender_hashes([tender_data['id'] for tender_data in tenders_data], conn)
+        for tender_data in tenders_data:
+            tender_data = dict(tender_data, content_hash=tender_data.get('content_hash') or compute_tender_hash(tender_data))
+            tender_id = tender_data['id']
+            if tender_id not in stored_hashes:
+                new_rows.append(_tender_row(tender_data, now_iso))
+                changes[tender_id] = "new"
+            elif stored_hashes[tender_id] is None:
+                backfill_rows.append(_tender_update_row(tender_data, now_iso))
+            elif stored_hashes[tender_id] != tender_data['content_hash']:
+                amended_rows.append(_tender_update_row(tender_data, now_iso))
+                changes[tender_id] = "amended"
+            else:
+                seen_rows.append((now_iso, tender_id))
+        with conn: # Commits on success, rolls the whole batch back on error
+            if new_rows:
+                conn.executemany(_TENDER_UPSERT_SQL, new_rows)
+            if amended_rows:
+                conn.executemany(_TENDER_AMEND_SQL, amended_rows)
+            if backfill_rows:
+                conn.executemany(_TENDER_BACKFILL_SQL, backfill_rows)
+            if seen_rows:
+                conn.executemany(_TENDER_SEEN_SQL, seen_rows)
+    except sqlite3.Error as e:
+        logger.error(f"SQLite error storing batch of {len(tenders_data)} tenders: {e}")
+        stats["failed"] = True
+        return stats
+    elapsed = time.perf_counter() - start
+    rows = len(tenders_data)
+    stats.update(
+        rows=rows, seconds=elapsed, rows_per_second=rows / elapsed if elapsed > 0 else float(rows),
+        new=len(new_rows), amended=len(amended_rows), unchanged=len(backfill_rows) + len(seen_rows), changes=changes
+    )
+    logger.info(f"Stored {rows} tenders in one transaction ({stats['rows_per_second']:.0f} rows/s): "
+                f"{stats['new']} new, {stats['amended']} amended, {stats['unchanged']} unchanged")
+    return stats
+
 
 class Tender:
     """Represents a procurement opportunity."""
@@ -132,6 +471,7 @@ class Tender:
         self.closing_date = closing_date
         self.value_text = value_text
         self.raw_data = raw_data if raw_data else {}
+        self.change_type = "new" # Set to "amended" by BasePortalScanner.store_batch when a stored tender changed
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -151,17 +491,72 @@ class BasePortalScanner(ABC):
     def __init__(self, portal_config: Dict[str, Any]):
         self.name = portal_config['name']
         self.config = portal_config
-        self.db_conn = sqlite3.connect(PROCESSED_TENDERS_DB_PATH) # Each scanner gets its own connection for thread safety if threaded later
+        self.persist_stats = {"rows": 0, "seconds": 0.0, "batches": 0, "new": 0, "amended": 0, "unchanged": 0, "failed_batches": 0}
+        self.time_budget = portal_config.get("time_budget_seconds", SCANNER_TIME_BUDGET_SECONDS)
+        self.deadline: Optional[float] = None # time.monotonic() deadline, set by run()
+        # Tenders returned by the current scan. Kept on the instance so an orchestrator that
+        # gives up on a scanner can still collect what it found so far.
+        self.found_tenders: List[Tender] = []
 
-    def __del__(self):
-        if self.db_conn:
-            self.db_conn.close()
+    @property
+    def db_conn(self) -> sqlite3.Connection:
+        """The calling thread's connection from the shared TenderDatabase (closed by run_all_scanners)."""
+        return tender_db.connection()
 
     @abstractmethod
     def scan(self) -> List[Tender]:
         """Scans the portal and returns a list of Tender objects."""
         pass
 
+    def run(self) -> List[Tender]:
+        """
+        Runs scan() under the scanner's time budget. Scanners check budget_exhausted() between
+        requests and stop early, returning what they have stored so far.
+        """
+        self.found_tenders = []
+        self.deadline = time.monotonic() + self.time_budget
+        return self.scan()
+
+    def budget_exhausted(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def store_batch(self, tenders: List[Tender], found_tenders: List[Tender], drop_raw_data: bool = False) -> bool:
+        """
+        Persists a batch of tenders in one transaction and appends the new and amended ones to found_tenders,
+        so unchanged tenders are not analyzed again.
+        drop_raw_data clears raw_data on the returned tenders once stored (it is kept in data_json).
+        Returns False if the transaction failed; persist_stats["failed_batches"] then holds the watermarks back.
+        """
+        unique = {tender.id: tender for tender in tenders} # Last copy wins if a batch repeats an ID
+        if not unique:
+            return True
+        stats = store_tenders_bulk([tender.to_dict() for tender in unique.values()], self.db_conn)
+        if stats["failed"]:
+            self.persist_stats["failed_batches"] += 1
+            for tender in unique.values(): # Detail pages: fetch them in full again next run
+                forget_url_validators(tender.url)
+            return False
+        for key in ("rows", "seconds", "new", "amended", "unchanged"):
+            self.persist_stats[key] += stats[key]
+        self.persist_stats["batches"] += 1
+        for tender_id, change_type in stats["changes"].items():
+            tender = unique[tender_id]
+            tender.change_type = change_type
+            if drop_raw_data:
+                tender.raw_data = {}
+            found_tenders.append(tender)
+        return True
+
+    def log_persist_stats(self):
+        rows, seconds = self.persist_stats["rows"], self.persist_stats["seconds"]
+        if rows:
+            logger.info(f"{self.name}: persisted {rows} rows in {self.persist_stats['batches']} transactions "
+                        f"({rows / seconds if seconds > 0 else rows:.0f} rows/s) - "
+                        f"{self.persist_stats['new']} new, {self.persist_stats['amended']} amended, "
+                        f"{self.persist_stats['unchanged']} unchanged")
+        if self.persist_stats["failed_batches"]:
+            logger.error(f"{self.name}: {self.persist_stats['failed_batches']} batches could not be stored (rolled back).")
+
     def _process_tender_item(self, item_data: Dict[str, Any], source_name: str) -> Optional[Tender]:
         """
         Processes a raw item from a portal into a Tender object.
@@ -196,58 +591,226 @@ class BasePortalScanner(ABC):
             raw_data=item_data.get('raw_data')
         )
 
-class ContractsFinderScanner(BasePortalScanner):
-    """Scanner for Contracts Finder (gov.uk) using their OCDS-based API."""
-    def scan(self) -> List[Tender]:
-        logger.info(f"Scanning {self.name}...")
-        found_tenders: List[Tender] = []
-        base_url = self.config['url'] # Base search URL
-        max_pages = self.config.get('max_pages_to_scan', 1)
-        page_num = 1
-
-        while page_num <= max_pages:
-            # Contracts Finder API seems to use 'pg' for page number
-            # And results_size for items per page.
-            # The provided URL already has pg=1. We need to adjust it.
-            if "pg=" in base_url:
-                 current_url = base_url.replace(f"pg={base_url.split('pg=')[1].split('&')[0]}", f"pg={page_num}")
-            else: # If pg parameter not in base_url, append it.
-                separator = '&' if '?' in base_url else '?'
-                current_url = f"{base_url}{separator}pg={page_num}"
-
-            logger.debug(f"Fetching from URL: {current_url}")
-            response = respectful_request("GET", current_url)
-            if not response:
-                logger.warning(f"Failed to fetch data from {self.name} at page {page_num}.")
-                break 
+class OCDSReleaseScanner(BasePortalScanner):
+    """
+    Shared parts of the OCDS release API scanners: watermark-based incremental sync and
+    batched persistence of decoded releases. Subclasses implement paging and _parse_ocds_release.
+    """
+    # True for feeds whose watermark is checkpointed part-way through a walk (_checkpoint_watermark):
+    # releases dated exactly at the mark may not all have been read, so they are read again rather
+    # than skipped (storing an unchanged release only bumps its last_seen_date).
+    watermark_inclusive = False
 
-            try:
-                data = response.json()
-            except json.JSONDecodeError:
-                logger.error(f"Failed to decode JSON from {self.name} at page {page_num}. Content: {response.text[:200]}")
-                break
-            
-            releases = data.get("releases", [])
-            if not releases:
-                logger.info(f"No more releases found on {self.name} at page {page_num}.")
-                break
+    def _begin_incremental_sync(self) -> int:
+        """
+        Loads the portal's watermark and resets the per-scan sync state.
+        Returns the page cap: `max_incremental_pages` once a watermark exists, otherwise `max_pages_to_scan`.
+        """
+        # Incremental sync: once a watermark exists, only ask for releases published since then.
+        # The first run (no watermark) reads the newest `max_pages_to_scan` pages as before.
+        self._watermark = get_portal_watermark(self.name, self.db_conn) if self.config.get("since_param") else None
+        self._watermark_dt = parse_release_date(self._watermark)
+        self._newest_release_date = self._watermark
+        self._checkpoint = self._watermark
+        self._reached_watermark = False
+        self._failed_pages = 0
+        if self._watermark:
+            logger.info(f"{self.name}: incremental sync from {self._watermark}")
+            return self.config.get('max_incremental_pages', 50)
+        return self.config.get('max_pages_to_scan', 1)
+
+    def _finish_incremental_sync(self, complete: bool, progress: str):
+        """Advances the watermark, but only if nothing between it and the newest release was missed."""
+        failed_batches = self.persist_stats["failed_batches"]
+        if self.config.get("since_param") and self._newest_release_date != self._watermark:
+            if failed_batches: # Releases read but not stored: the next run must fetch them again
+                logger.warning(f"{self.name}: {failed_batches} batches failed to store ({progress}). Watermark kept at {self._watermark}.")
+            elif complete or not self._watermark:
+                set_portal_watermark(self.name, self._newest_release_date, self.db_conn)
+            else:
+                logger.warning(f"{self.name}: incremental sync incomplete ({self._failed_pages} failed pages, "
+                               f"{progress}). Watermark kept at {self._watermark}.")
 
+    def _checkpoint_watermark(self):
+        """
+        For feeds read oldest first: saves the newest release date seen so far as the watermark, once
+        everything up to it is stored. Nothing is saved after a failed page or batch, so the next
+        run starts again before the releases that were missed.
+        """
+        if self._failed_pages or self.persist_stats["failed_batches"]:
+            return
+        if self.config.get("since_param") and self._newest_release_date != self._checkpoint:
+            set_portal_watermark(self.name, self._newest_release_date, self.db_conn)
+            self._checkpoint = self._newest_release_date
+
+    def _failure_count(self) -> int:
+        return self._failed_pages + self.persist_stats["failed_batches"]
+
+    def _forget_page_if_failed(self, page_url: str, failures_before: int):
+        """Drops the cached validators of a page that failed to parse or store (see forget_url_validators)."""
+        if self._failure_count() > failures_before:
+            forget_url_validators(page_url)
+
+    def _store_releases(self, releases: Iterable[Dict[str, Any]], found_tenders: List[Tender],
+                        streaming: bool, page_label: str) -> Optional[int]:
+        """
+        Parses and stores the releases of one page. When streaming, tenders are flushed every
+        PERSIST_BATCH_SIZE releases instead of once per page.
+        Returns the number of releases read, or None if the body turned out to be invalid JSON
+        (releases decoded before the error are still stored).
+        """
+        batch_size = PERSIST_BATCH_SIZE if streaming else None # Whole page per transaction unless streaming
+        release_count = 0
+        batch: List[Tender] = []
+        try:
             for release in releases:
+                release_count += 1
+                if not self._is_newer_than_watermark(release):
+                    continue
                 tender_data = self._parse_ocds_release(release)
                 if tender_data:
                     tender_obj = self._process_tender_item(tender_data, self.name)
                     if tender_obj:
-                        if not is_tender_processed(tender_obj.id, self.db_conn):
-                             found_tenders.append(tender_obj)
-                        store_tender_data(tender_obj.to_dict(), self.db_conn)
+                        batch.append(tender_obj)
+                        if batch_size and len(batch) >= batch_size:
+                            # Streaming: don't keep every release of the page in memory
+                            self.store_batch(batch, found_tenders, drop_raw_data=True)
+                            batch = []
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to decode JSON from {self.name} at {page_label} after {release_count} releases: {e}")
+            self._failed_pages += 1
+            return None
+        finally:
+            self.store_batch(batch, found_tenders, drop_raw_data=streaming)
+        return release_count
 
-            logger.info(f"Found {len(releases)} items on page {page_num} of {self.name}. Processed {len(found_tenders)} new tenders so far from this source.")
-            page_num += 1
-            if page_num > data.get("max_pg", max_pages): # Check if API provides max pages
-                break
+    def _is_newer_than_watermark(self, release: Dict[str, Any]) -> bool:
+        """
+        True if the release is newer than the watermark. Also tracks the newest release date seen, and
+        flags when a release older than the mark shows up (the filter parameter was not applied server side).
+        """
+        release_date = release.get("date")
+        release_dt = parse_release_date(release_date)
+        if release_dt is None:
+            return True # Undated releases are always processed
+        if self._newest_release_date is None or release_dt > parse_release_date(self._newest_release_date):
+            self._newest_release_date = release_date
+        if self._watermark_dt is None:
+            return True
+        if release_dt < self._watermark_dt:
+            self._reached_watermark = True
+        if self.watermark_inclusive:
+            return release_dt >= self._watermark_dt
+        return release_dt > self._watermark_dt # Releases dated exactly at the mark were stored last run
 
+    @abstractmethod
+    def _parse_ocds_release(self, release: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Maps one OCDS release to the tender item fields used by _process_tender_item (None to skip it)."""
+        pass
+
+
+class ContractsFinderScanner(OCDSReleaseScanner):
+    """Scanner for Contracts Finder (gov.uk) using their OCDS-based API."""
+    def scan(self) -> List[Tender]:
+        logger.info(f"Scanning {self.name}...")
+        found_tenders = self.found_tenders
+        max_pages = self._begin_incremental_sync()
+
+        # Page 1 is fetched on its own because it tells us how many pages there are (max_pg)
+        page_data = self._handle_page(1, *self._fetch_page(1), found_tenders)
+        if page_data is False:
+            return found_tenders
+        first_page_unchanged = page_data is None
+        reported_max_pg = page_data.get("max_pg", max_pages) if page_data else max_pages
+        last_page = min(max_pages, reported_max_pg)
+        if self._reached_watermark or first_page_unchanged:
+            # Results are newest first: later pages only hold releases we already have.
+            # An unchanged page 1 means nothing was published since the last scan.
+            last_page = 1
+
+        # Remaining pages are fetched concurrently (per-host politeness still applies in respectful_request).
+        # Each page is parsed and stored as soon as it arrives, while the others are still in flight.
+        if last_page > 1:
+            asyncio.run(self._scan_pages_concurrently(range(2, last_page + 1), found_tenders))
+        self.log_persist_stats()
+
+        complete = self._failed_pages == 0 and (self._reached_watermark or first_page_unchanged or last_page >= reported_max_pg)
+        self._finish_incremental_sync(complete, f"{last_page}/{reported_max_pg} pages read")
         return found_tenders
 
+    async def _scan_pages_concurrently(self, page_numbers, found_tenders: List[Tender]):
+        async for page_num, (response, unchanged) in map_bounded(self._fetch_page, page_numbers):
+            self._handle_page(page_num, response, unchanged, found_tenders)
+
+    def _fetch_page(self, page_num: int):
+        if self.budget_exhausted(): # Pages not started before the deadline are skipped (counted as failed)
+            return None, False
+        # stream_json: leave the body on the socket and decode releases one at a time in _handle_page
+        return conditional_request(self._page_url(page_num), stream=bool(self.config.get("stream_json")))
+
+    def _page_url(self, page_num: int) -> str:
+        base_url = self.config['url'] # Base search URL
+        # Contracts Finder API seems to use 'pg' for page number
+        # And results_size for items per page.
+        # The provided URL already has pg=1. We need to adjust it.
+        if "pg=" in base_url:
+            url = base_url.replace(f"pg={base_url.split('pg=')[1].split('&')[0]}", f"pg={page_num}")
+        else: # If pg parameter not in base_url, append it.
+            separator = '&' if '?' in base_url else '?'
+            url = f"{base_url}{separator}pg={page_num}"
+        if self._watermark:
+            url = f"{url}&{self.config['since_param']}={quote(self._watermark)}"
+        return url
+
+    def _handle_page(self, page_num: int, response, unchanged: bool, found_tenders: List[Tender]):
+        """
+        Parses one search result page and stores its releases.
+        Returns the decoded page, None if it was unchanged since the last scan, or False if it failed or was empty.
+        """
+        if not response:
+            if self.budget_exhausted():
+                logger.debug(f"{self.name}: time budget used up, page {page_num} skipped.")
+            else:
+                logger.warning(f"Failed to fetch data from {self.name} at page {page_num}.")
+            self._failed_pages += 1
+            return False
+        if unchanged:
+            response.close()
+            logger.info(f"Page {page_num} of {self.name} unchanged since last scan. Skipping parse.")
+            return None
+
+        streaming = bool(self.config.get("stream_json"))
+        failures_before = self._failure_count()
+        try:
+            if streaming:
+                releases = StreamingJSONArray(response.iter_content(chunk_size=64 * 1024), "releases")
+            else:
+                data = response.json()
+                releases = data.get("releases", [])
+            release_count = self._store_releases(releases, found_tenders, streaming, f"page {page_num}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to decode JSON from {self.name} at page {page_num}: {e}")
+            self._failed_pages += 1
+            return False
+        except requests.exceptions.RequestException as e: # Streamed body cut off mid-read (e.g. ChunkedEncodingError)
+            logger.error(f"Connection lost reading {self.name} page {page_num} ({response.url}): {e}")
+            self._failed_pages += 1
+            return False
+        finally:
+            response.close()
+            self._forget_page_if_failed(self._page_url(page_num), failures_before)
+        if release_count is None:
+            return False
+
+        if streaming:
+            data = releases.metadata
+        if not release_count:
+            logger.info(f"No more releases found on {self.name} at page {page_num}.")
+            return False
+
+        logger.info(f"Found {release_count} items on page {page_num} of {self.name}. Processed {len(found_tenders)} new tenders so far from this source.")
+        return data
+
     def _parse_ocds_release(self, release: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Parses a single OCDS release from Contracts Finder."""
         try:
@@ -332,34 +895,345 @@ class ContractsFinderScanner(BasePortalScanner):
             return None
 
 
+class FindATenderScanner(OCDSReleaseScanner):
+    """
+    Scanner for Find a Tender (FTS) OCDS release packages.
+    FTS pages with an opaque cursor: each package links to the next one in `links.next`,
+    so pages are read one after another rather than fanned out. Releases come oldest update first,
+    so the watermark is checkpointed after every stored package and a walk cut short (page cap,
+    time budget, failed page) is continued from there by the next run.
+    """
+    watermark_inclusive = True
+
+    def scan(self) -> List[Tender]:
+        logger.info(f"Scanning {self.name}...")
+        found_tenders = self.found_tenders
+        max_pages = self._begin_incremental_sync()
+        streaming = bool(self.config.get("stream_json"))
+
+        url = self._first_page_url()
+        pages_read = 0
+        while url and pages_read < max_pages:
+            if self.budget_exhausted():
+                logger.warning(f"{self.name}: time budget of {self.time_budget}s used up after {pages_read} pages.")
+                break
+            pages_read += 1
+            response, unchanged = conditional_request(url, stream=streaming)
+            if not response:
+                logger.warning(f"Failed to fetch data from {self.name} at page {pages_read}.")
+                self._failed_pages += 1
+                break # The cursor for the following page is in this one
+            if unchanged:
+                response.close()
+                logger.info(f"Page {pages_read} of {self.name} unchanged since last scan. Skipping parse.")
+                url = None
+                break
+            url = self._handle_package(pages_read, url, response, streaming, found_tenders)
+            self._checkpoint_watermark()
+        self.log_persist_stats()
+
+        # Complete once the last package (no next link) was read and stored without errors
+        if self._failed_pages or self.persist_stats["failed_batches"] or url:
+            logger.warning(f"{self.name}: sync stopped after {pages_read} pages ({self._failed_pages} failed pages, "
+                           f"{self.persist_stats['failed_batches']} failed batches, next page {'pending' if url else 'none'}). "
+                           f"Watermark at {self._checkpoint}; the next run continues from there.")
+        return found_tenders
+
+    def _first_page_url(self) -> str:
+        params = dict(self.config.get("api_specific_params") or {})
+        if self.config.get("page_size"):
+            params["limit"] = self.config["page_size"]
+        since_dt = self._watermark_dt
+        if since_dt is None and self.config.get("initial_lookback_days"):
+            # First run: start from a recent date instead of the start of the feed
+            since_dt = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=self.config["initial_lookback_days"])
+        if since_dt and self.config.get("since_param"):
+            # FTS expects yyyy-MM-ddTHH:mm:ss (UTC) rather than a full ISO 8601 timestamp
+            params[self.config["since_param"]] = since_dt.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        query = "&".join(f"{key}={quote(str(value))}" for key, value in params.items())
+        base_url = self.config['url']
+        if not query:
+            return base_url
+        return f"{base_url}{'&' if '?' in base_url else '?'}{query}"
+
+    def _handle_package(self, page_num: int, page_url: str, response, streaming: bool,
+                        found_tenders: List[Tender]) -> Optional[str]:
+        """Stores the releases of one release package. Returns the next page URL, or None if there is none or it failed."""
+        failures_before = self._failure_count()
+        try:
+            if streaming:
+                releases = StreamingJSONArray(response.iter_content(chunk_size=64 * 1024), "releases")
+            else:
+                package = response.json()
+                releases = package.get("releases", [])
+            release_count = self._store_releases(releases, found_tenders, streaming, f"page {page_num}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to decode JSON from {self.name} at page {page_num}: {e}")
+            self._failed_pages += 1
+            return None
+        except requests.exceptions.RequestException as e: # Streamed body cut off mid-read (e.g. ChunkedEncodingError)
+            logger.error(f"Connection lost reading {self.name} page {page_num} ({response.url}): {e}")
+            self._failed_pages += 1
+            return None
+        finally:
+            response.close()
+            self._forget_page_if_failed(page_url, failures_before)
+        if release_count is None:
+            return None
+        if streaming:
+            package = releases.metadata # Top-level fields, including links, once the releases are consumed
+
+        logger.info(f"Found {release_count} items on page {page_num} of {self.name}. Processed {len(found_tenders)} new tenders so far from this source.")
+        if not release_count:
+            return None
+        return (package.get("links") or {}).get("next")
+
+    def _parse_ocds_release(self, release: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parses a single OCDS release from Find a Tender. The release id is the notice number (e.g. 012345-2024)."""
+        try:
+            tender_info = release.get("tender", {})
+            title = tender_info.get("title")
+            notice_id = release.get("id")
+            if not title or not notice_id:
+                logger.warning(f"Could not parse essential fields (title/id) from OCDS release: {release.get('ocid')}")
+                return None
+            value_info = tender_info.get("value", {})
+            return {
+                "title": title,
+                "url": f"https://www.find-tender.service.gov.uk/Notice/{notice_id}",
+                "description": tender_info.get("description") or title,
+                "published_date": release.get("date"),
+                "closing_date": tender_info.get("tenderPeriod", {}).get("endDate"),
+                "value_text": f"{value_info.get('amount')} {value_info.get('currency')}" if value_info.get('amount') else None,
+                "raw_data": release
+            }
+        except Exception as e:
+            logger.error(f"Error parsing OCDS release: {e}. Release data: {json.dumps(release)[:500]}")
+            return None
+
+
+# --- Sitemap / RSS / Atom discovery ---
+def _xml_local_name(tag: str) -> str:
+    """Tag name without its XML namespace, lowercased ("{http://www.sitemaps.org/...}url" -> "url")."""
+    return tag.rsplit('}', 1)[-1].lower()
+
+def parse_feed_date(date_text: Optional[str]) -> Optional[datetime.datetime]:
+    """Parses a sitemap lastmod / Atom date (W3C / ISO 8601) or an RSS pubDate (RFC 822) into an aware datetime."""
+    if not date_text or not date_text.strip():
+        return None
+    parsed = parse_release_date(date_text.strip())
+    if parsed:
+        return parsed
+    try:
+        parsed = parsedate_to_datetime(date_text.strip())
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+
+def parse_discovery_document(content: bytes) -> Tuple[str, List[Tuple[str, Optional[datetime.datetime]]]]:
+    """
+    Parses a sitemap, sitemap index, RSS or Atom document.
+    Returns (kind, [(url, date), ...]) where kind is "urlset", "sitemapindex", "rss" or "atom" and
+    date is the entry's lastmod / pubDate / updated (None if absent).
+    Raises ET.ParseError on malformed XML and ValueError on any other document type.
+    """
+    root = ET.fromstring(content)
+    kind = _xml_local_name(root.tag)
+    entries: List[Tuple[str, Optional[datetime.datetime]]] = []
+    if kind in ("urlset", "sitemapindex"):
+        for node in root: # <url> or <sitemap>
+            loc, lastmod = None, None
+            for child in node:
+                name = _xml_local_name(child.tag)
+                if name == "loc":
+                    loc = (child.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = parse_feed_date(child.text)
+            if loc:
+                entries.append((loc, lastmod))
+        return kind, entries
+    if kind in ("rss", "rdf"): # RSS 2.0, or RSS 1.0 (RDF) with items at the top level
+        for item in root.iter():
+            if _xml_local_name(item.tag) != "item":
+                continue
+            link, item_date = None, None
+            for child in item:
+                name = _xml_local_name(child.tag)
+                if name == "link" and child.text:
+                    link = child.text.strip()
+                elif name in ("pubdate", "date"): # <pubDate> or <dc:date>
+                    item_date = parse_feed_date(child.text)
+            if link:
+                entries.append((link, item_date))
+        return "rss", entries
+    if kind == "feed": # Atom
+        for entry in root:
+            if _xml_local_name(entry.tag) != "entry":
+                continue
+            link, updated, published = None, None, None
+            for child in entry:
+                name = _xml_local_name(child.tag)
+                if name == "link" and child.get("rel", "alternate") == "alternate" and child.get("href"):
+                    link = child.get("href").strip()
+                elif name == "updated":
+                    updated = parse_feed_date(child.text)
+                elif name == "published":
+                    published = parse_feed_date(child.text)
+            if link:
+                entries.append((link, updated or published))
+        return "atom", entries
+    raise ValueError(f"Unsupported discovery document <{kind}>")
+
+
 class GenericWebsiteScraper(BasePortalScanner):
     """
-    Conceptual scraper for generic websites.
-    Requires specific selectors and parsing logic per site.
-    This is a placeholder to show the structure.
+    Scraper for websites without an API (e.g. council procurement pages).
+    Tender links come from the portal's `feed_url` (RSS/Atom) and/or `sitemap_url` when configured,
+    keeping only entries dated after the last run. The listing page (`start_url` + `link_selector`)
+    is parsed only when no feed is configured or none could be read. The detail pages are then
+    fetched concurrently and parsed with the CSS selectors in `detail_selectors`.
     """
+    MAX_CHILD_SITEMAPS = 20 # Per sitemap index, newest first
+    # Tried in order; a config value (string or list) for a field replaces its defaults
+    DEFAULT_DETAIL_SELECTORS = {
+        "title": ["h1", "title"],
+        "description": ["meta[name=description]", "main", "article", "#content"],
+        "published_date": [],
+        "closing_date": [],
+        "value": []
+    }
+    MAX_DESCRIPTION_CHARS = 4000
+
     def scan(self) -> List[Tender]:
         logger.info(f"Scanning {self.name} (generic web scraper)...")
-        found_tenders: List[Tender] = []
+        found_tenders = self.found_tenders
         
-        start_url = self.config.get("start_url")
-        if not start_url:
-            logger.error(f"No start_url configured for {self.name}")
-            return []
+        self._detail_budget_hit = False
+        self._detail_fetch_failed = False
+        self._discovery_urls: List[str] = [] # Feeds, sitemaps and listing pages fetched this scan
+        tender_urls = self._discover_links_from_feeds()
+        used_feeds = tender_urls is not None
+        if not used_feeds:
+            start_url = self.config.get("start_url")
+            if not start_url:
+                logger.error(f"No start_url, feed_url or sitemap_url configured for {self.name}")
+                return []
+            tender_urls = self._discover_links_from_listing(start_url)
+
+        if tender_urls:
+            self._process_detail_links(tender_urls, found_tenders)
+        self.log_persist_stats()
+        if self.persist_stats["failed_batches"]:
+            # Otherwise an unchanged feed/listing next run would hide the links whose tenders were not stored
+            for discovery_url in self._discovery_urls:
+                forget_url_validators(discovery_url)
+        if used_feeds:
+            self._finish_feed_discovery()
+
+        logger.info(f"Generic scan of {self.name} complete. Found {len(found_tenders)} new tenders.")
+        return found_tenders
 
-        response = respectful_request("GET", start_url)
+    def _discover_links_from_feeds(self) -> Optional[List[str]]:
+        """
+        Returns the tender links from the configured feed/sitemap that are newer than the portal's
+        discovery watermark, or None if no feed is configured or none could be read.
+        """
+        feed_urls = [url for url in (self.config.get("feed_url"), self.config.get("sitemap_url")) if url]
+        if not feed_urls:
+            return None
+        self._feed_watermark = get_portal_watermark(self.name, self.db_conn)
+        self._feed_watermark_dt = parse_release_date(self._feed_watermark)
+        self._newest_entry_dt = self._feed_watermark_dt
+        self._watermark_cap = None # Set when only part of a sitemap index was read
+        self._feed_failed = False
+        url_pattern = self.config.get("discovery_url_pattern") # Sitemaps list the whole site: keep tender pages only
+        self._discovery_url_pattern = re.compile(url_pattern) if url_pattern else None
+
+        links: Dict[str, None] = {} # Ordered set
+        feeds_read = [self._read_discovery_document(feed_url, links) for feed_url in feed_urls]
+        if not any(feeds_read):
+            logger.warning(f"{self.name}: no feed or sitemap could be read. Falling back to the listing page.")
+            self._feed_failed = True
+            return None
+        logger.info(f"{self.name}: {len(links)} tender links newer than {self._feed_watermark or 'the first run'} from feeds/sitemaps.")
+        return list(links)
+
+    def _read_discovery_document(self, doc_url: str, links: Dict[str, None], depth: int = 0) -> bool:
+        """Adds the new entries of one sitemap/feed to `links`, following a sitemap index one level down."""
+        response, unchanged = conditional_request(doc_url)
+        self._discovery_urls.append(doc_url)
+        if unchanged:
+            logger.info(f"{self.name}: {doc_url} unchanged since last scan.")
+            return True
+        if not response or not response.content:
+            logger.warning(f"{self.name}: failed to fetch {doc_url}.")
+            self._feed_failed = True
+            return False
+        try:
+            kind, entries = parse_discovery_document(response.content)
+        except (ET.ParseError, ValueError) as e:
+            logger.error(f"{self.name}: could not parse {doc_url} as a sitemap or feed: {e}")
+            self._feed_failed = True
+            return False
+
+        newer = []
+        for url, entry_dt in entries:
+            if entry_dt and (self._newest_entry_dt is None or entry_dt > self._newest_entry_dt):
+                self._newest_entry_dt = entry_dt
+            if entry_dt and self._feed_watermark_dt and entry_dt <= self._feed_watermark_dt:
+                continue # Unchanged since the last run
+            newer.append((url, entry_dt))
+
+        if kind == "sitemapindex":
+            if depth > 0:
+                logger.warning(f"{self.name}: nested sitemap index {doc_url} ignored.")
+                return True
+            oldest = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+            newer.sort(key=lambda entry: entry[1] or oldest)
+            if len(newer) > self.MAX_CHILD_SITEMAPS:
+                # Oldest first, and the mark stops at the newest child read: the rest are read on later runs
+                newer = newer[:self.MAX_CHILD_SITEMAPS]
+                self._watermark_cap = max((entry_dt for _, entry_dt in newer if entry_dt), default=self._feed_watermark_dt)
+                logger.warning(f"{self.name}: more than {self.MAX_CHILD_SITEMAPS} child sitemaps changed. Reading the oldest "
+                               f"{self.MAX_CHILD_SITEMAPS}, up to {self._watermark_cap}; the rest on later runs.")
+            for child_url, _ in newer:
+                if self.budget_exhausted():
+                    self._feed_failed = True
+                    break
+                self._read_discovery_document(child_url, links, depth + 1) # Failures set _feed_failed
+            return True
+
+        for url, _ in newer:
+            url = urljoin(doc_url, url).split('#')[0]
+            if self._discovery_url_pattern is None or self._discovery_url_pattern.search(url):
+                links[url] = None
+        return True
+
+    def _finish_feed_discovery(self):
+        """
+        Moves the discovery watermark to the newest entry date (no further than the newest child sitemap read),
+        unless a feed, child sitemap or detail page failed or the time budget ran out.
+        """
+        if self._feed_failed or self._detail_budget_hit or self._detail_fetch_failed or self.persist_stats["failed_batches"]:
+            logger.warning(f"{self.name}: discovery incomplete. Watermark kept at {self._feed_watermark}.")
+            return
+        newest = self._newest_entry_dt
+        if newest and self._watermark_cap and newest > self._watermark_cap:
+            newest = self._watermark_cap
+        if newest and newest != self._feed_watermark_dt:
+            set_portal_watermark(self.name, newest.isoformat(), self.db_conn)
+
+    def _discover_links_from_listing(self, start_url: str) -> List[str]:
+        """Returns the absolute, de-duplicated tender links on the listing page (empty if it is unchanged)."""
+        response, unchanged = conditional_request(start_url)
+        self._discovery_urls.append(start_url)
+        if unchanged:
+            logger.info(f"Page {start_url} unchanged since last scan. Skipping parse.")
+            return []
         if not response or not response.text:
             logger.error(f"Failed to fetch start page for {self.name}: {start_url}")
             return []
 
-        # Basic caching check based on page content hash (simple example)
-        # import hashlib
-        # content_hash = hashlib.md5(response.text.encode()).hexdigest()
-        # if is_url_cached_and_unchanged(start_url, content_hash):
-        #     logger.info(f"Page {start_url} unchanged since last scan,_url_cache.")
-        #     # return [] # Or load from a more persistent cache if needed.
-        # add_to_url_cache(start_url, content_hash)
-        
         soup = BeautifulSoup(response.text, 'lxml') # 'lxml' is usually faster
         
         # --- This part is highly site-specific ---
@@ -369,48 +1243,88 @@ class GenericWebsiteScraper(BasePortalScanner):
             logger.error(f"No link_selector configured for {self.name}")
             return []
 
+        tender_urls: Dict[str, None] = {} # Ordered set
         for link_tag in soup.select(link_selector):
             tender_url = link_tag.get('href')
-            if not tender_url:
-                continue
-            
-            # Ensure URL is absolute
-            from urllib.parse import urljoin
-            tender_url = urljoin(start_url, tender_url)
-            
-            # Now, fetch and parse the tender detail page
-            # This would involve another respectful_request and parsing logic
-            logger.debug(f"Found potential tender link: {tender_url} on {self.name}")
-
-            # Check if already processed (using URL)
-            temp_tender_id = generate_tender_id(tender_url, tender_url) # Temp ID with URL as title
-            if is_tender_processed(temp_tender_id, self.db_conn):
-                logger.debug(f"Tender at {tender_url} likely processed. Checking for updates or skipping.")
-                # For now, we skip if ID exists. A more robust way is to fetch and compare.
-                # Or update last_seen_date if fetched and identical.
-                continue 
-
-            # Placeholder for fetching and parsing detail page
-            # tender_page_response = respectful_request("GET", tender_url)
-            # if tender_page_response and tender_page_response.text:
-            #     detail_soup = BeautifulSoup(tender_page_response.text, 'lxml')
-            #     # Extract title, description, dates, value etc. from detail_soup
-            #     # This is the most complex part of web scraping.
-            #     title = detail_soup.select_one("h1.tender-title").text # Example
-            #     description = detail_soup.select_one("div.tender-description").text # Example
-            #     ...
-            #     tender_item_data = {
-            #         "title": title, "url": tender_url, "description": description, ...
-            #     }
-            #     tender_obj = self._process_tender_item(tender_item_data, self.name)
-            #     if tender_obj:
-            #         found_tenders.append(tender_obj)
-            #         store_tender_data(tender_obj.to_dict(), self.db_conn)
-            
-            logger.warning(f"GenericWebsiteScraper for {self.name} is conceptual. Detail page parsing for {tender_url} not implemented.")
+            if tender_url:
+                tender_urls[urljoin(start_url, tender_url).split('#')[0]] = None # Ensure URL is absolute
+        logger.debug(f"Found {len(tender_urls)} potential tender links on {self.name}")
+        return list(tender_urls)
 
-        logger.info(f"Generic scan of {self.name} complete. Found {len(found_tenders)} new tenders.")
-        return found_tenders
+    def _process_detail_links(self, tender_urls: List[str], found_tenders: List[Tender]):
+        """
+        Fetches and stores the detail pages of links not seen before. Links already in the tenders
+        table, or already found unchanged earlier in this run, are not requested again.
+        """
+        stored_urls = get_stored_tender_urls(tender_urls, self.db_conn)
+        pending = [url for url in tender_urls if url not in stored_urls and not is_url_unchanged_this_run(url)]
+        skipped = len(tender_urls) - len(pending)
+        if skipped:
+            logger.info(f"{self.name}: skipping {skipped} of {len(tender_urls)} links already stored or unchanged.")
+        if not pending:
+            return
+        workers = self.config.get("detail_workers", MAX_CONCURRENT_SCRAPERS)
+        asyncio.run(self._fetch_details_concurrently(pending, found_tenders, workers))
+
+    async def _fetch_details_concurrently(self, tender_urls: List[str], found_tenders: List[Tender], workers: int):
+        # Fetch + parse run on worker threads (host_limiter caps requests per host inside respectful_request);
+        # results are stored here on the loop thread, one transaction per PERSIST_BATCH_SIZE tenders.
+        batch: List[Tender] = []
+        try:
+            async for _, tender in map_bounded(self._fetch_detail, tender_urls, max_concurrency=workers):
+                if tender:
+                    batch.append(tender)
+                    if len(batch) >= PERSIST_BATCH_SIZE:
+                        self.store_batch(batch, found_tenders)
+                        batch = []
+        finally:
+            self.store_batch(batch, found_tenders)
+
+    def _fetch_detail(self, tender_url: str) -> Optional[Tender]:
+        if self.budget_exhausted(): # Links not started before the deadline are left for the next run
+            self._detail_budget_hit = True
+            return None
+        response, unchanged = conditional_request(tender_url)
+        if unchanged:
+            return None
+        if not response or not response.text:
+            self._detail_fetch_failed = True # Retried next run: the discovery watermark must not pass it
+            return None
+        tender_item_data = self._parse_detail_page(tender_url, response.text)
+        if not tender_item_data:
+            return None
+        return self._process_tender_item(tender_item_data, self.name)
+
+    def _parse_detail_page(self, tender_url: str, html: str) -> Optional[Dict[str, Any]]:
+        """Extracts title, description, dates and value from a detail page using the configured selectors."""
+        detail_soup = BeautifulSoup(html, 'lxml')
+        configured = self.config.get("detail_selectors", {})
+
+        def first_text(field: str) -> Optional[str]:
+            selectors = configured.get(field, self.DEFAULT_DETAIL_SELECTORS.get(field, []))
+            for selector in ([selectors] if isinstance(selectors, str) else selectors):
+                element = detail_soup.select_one(selector)
+                if element is None:
+                    continue
+                text = element.get("content") if element.name == "meta" else element.get_text(" ", strip=True)
+                if text:
+                    return text
+            return None
+
+        title = first_text("title")
+        if not title:
+            logger.warning(f"No title found on detail page {tender_url} ({self.name}). Skipping.")
+            return None
+        description = first_text("description") or title
+        return {
+            "title": title,
+            "url": tender_url,
+            "description": description[:self.MAX_DESCRIPTION_CHARS],
+            "published_date": first_text("published_date"),
+            "closing_date": first_text("closing_date"),
+            "value_text": first_text("value"),
+            "raw_data": {"detail_url": tender_url, "listing_url": self.config.get("start_url")}
+        }
 
 
 def get_scanner_for_portal(portal_config: Dict[str, Any]) -> Optional[BasePortalScanner]:
@@ -420,46 +1334,135 @@ def get_scanner_for_portal(portal_config: Dict[str, Any]) -> Optional[BasePortal
         # For now, assume Contracts Finder is the main API type implemented
         if "contractsfinder.service.gov.uk" in portal_config.get("url", ""):
             return ContractsFinderScanner(portal_config)
-        # Add other API scanner types here, e.g., FTSScanner
+        if "find-tender.service.gov.uk" in portal_config.get("url", ""):
+            return FindATenderScanner(portal_config)
+        # Add other API scanner types here
         logger.warning(f"API scanner for {portal_config['name']} not fully implemented, using generic approach if possible or skipping.")
         # Fallback or specific handling for other APIs can be added.
         return None # Or a more generic APIScanner if one is created
     elif portal_type == "generic_scrape":
-        logger.warning(f"GenericWebsiteScraper for {portal_config['name']} is conceptual and may not yield results without specific parsing logic.")
+        if not portal_config.get("detail_selectors"):
+            logger.info(f"No detail_selectors configured for {portal_config['name']}. Using generic title/description selectors.")
         return GenericWebsiteScraper(portal_config)
     # Add other types like 'rss', 'nhs_specific_api', etc.
     else:
         logger.error(f"Unknown portal type: {portal_type} for {portal_config['name']}")
         return None
 
-def run_all_scanners() -> List[Tender]:
-    """Runs all configured scanners and aggregates new tenders."""
+def _run_scanner_timed(scanner: BasePortalScanner) -> Dict[str, Any]:
+    """Runs one scanner on a worker thread and returns its report entry."""
+    start = time.monotonic()
+    status = "completed"
+    try:
+        tenders = scanner.run()
+        if scanner.budget_exhausted():
+            status = "timed_out" # Stopped cooperatively at the deadline; what it stored is kept
+    except Exception as e:
+        logger.error(f"Error running scanner {scanner.name}: {e}", exc_info=True)
+        tenders = list(scanner.found_tenders)
+        status = "failed"
+    return {"status": status, "seconds": time.monotonic() - start, "tenders": tenders}
+
+def _scanner_report_entry(scanner: BasePortalScanner, status: str, seconds: float, tenders: List[Tender]) -> Dict[str, Any]:
+    return {
+        "portal": scanner.name, "status": status, "seconds": round(seconds, 2),
+        "budget_seconds": scanner.time_budget, "tenders": len(tenders),
+        "new": scanner.persist_stats["new"], "amended": scanner.persist_stats["amended"],
+        "unchanged": scanner.persist_stats["unchanged"]
+    }
+
+def run_all_scanners_with_report() -> Tuple[List[Tender], List[Dict[str, Any]]]:
+    """
+    Runs all configured scanners concurrently (up to MAX_CONCURRENT_PORTAL_SCANS at a time), each under
+    its own time budget, and aggregates new and amended tenders.
+    Returns (tenders, report) where report has one entry per portal:
+    {"portal", "status", "seconds", "budget_seconds", "tenders", "new", "amended", "unchanged"}.
+    status is completed, timed_out (stopped at the deadline), abandoned (still running after the
+    grace period; partial results kept), failed or skipped.
+    """
     init_db() # Ensure DB and table exist
     load_url_cache() # Load URL cache at the beginning of a scan run
-    
-    all_new_tenders: List[Tender] = []
-    for portal_conf in PORTAL_CONFIGS:
+    prefetch_robots(conf.get("url") or conf.get("start_url") or conf.get("feed_url") or conf.get("sitemap_url")
+                    for conf in PORTAL_CONFIGS)
+
+    report_by_portal: Dict[int, Dict[str, Any]] = {}
+    tenders_by_portal: Dict[int, List[Tender]] = {}
+    scanners: Dict[int, BasePortalScanner] = {}
+    for index, portal_conf in enumerate(PORTAL_CONFIGS):
         logger.info(f"Initializing scanner for: {portal_conf['name']}")
         scanner = get_scanner_for_portal(portal_conf)
         if scanner:
-            try:
-                new_tenders_from_portal = scanner.scan()
-                all_new_tenders.extend(new_tenders_from_portal)
-                logger.info(f"Scanner {scanner.name} found {len(new_tenders_from_portal)} new tenders.")
-            except Exception as e:
-                logger.error(f"Error running scanner {scanner.name}: {e}", exc_info=True)
+            scanners[index] = scanner
         else:
             logger.warning(f"No suitable scanner found or configured for {portal_conf['name']}. Skipping.")
-            
+            report_by_portal[index] = {"portal": portal_conf['name'], "status": "skipped", "seconds": 0.0,
+                                       "budget_seconds": 0, "tenders": 0, "new": 0, "amended": 0, "unchanged": 0}
+
+    # Scanners run on daemon threads rather than a ThreadPoolExecutor: executor workers are joined at
+    # interpreter exit, so a scanner stuck in a blocking call would keep the process (and the job) alive.
+    # An abandoned daemon thread is simply dropped when the process exits.
+    abandoned = 0
+    results: "queue.Queue[Tuple[int, Dict[str, Any]]]" = queue.Queue()
+    waiting = list(scanners)
+    running: Dict[int, BasePortalScanner] = {}
+    max_running = max(1, MAX_CONCURRENT_PORTAL_SCANS)
+    while waiting or running:
+        while waiting and len(running) < max_running: # An abandoned scanner frees its slot
+            index = waiting.pop(0)
+            running[index] = scanners[index]
+            threading.Thread(target=lambda i=index: results.put((i, _run_scanner_timed(scanners[i]))),
+                             name=f"scanner-{index}", daemon=True).start()
+        try:
+            index, result = results.get(timeout=1.0)
+            if running.pop(index, None) is not None: # Ignore results of scanners already abandoned
+                tenders_by_portal[index] = result["tenders"]
+                report_by_portal[index] = _scanner_report_entry(scanners[index], result["status"], result["seconds"], result["tenders"])
+        except queue.Empty:
+            pass
+        # A scanner stuck in a blocking call past its budget + grace is left behind with what it has
+        now = time.monotonic()
+        for index, scanner in list(running.items()):
+            if scanner.deadline is not None and now >= scanner.deadline + SCANNER_BUDGET_GRACE_SECONDS:
+                del running[index]
+                abandoned += 1
+                tenders_by_portal[index] = list(scanner.found_tenders)
+                seconds = now - (scanner.deadline - scanner.time_budget)
+                report_by_portal[index] = _scanner_report_entry(scanner, "abandoned", seconds, tenders_by_portal[index])
+                logger.error(f"Scanner {scanner.name} still running {SCANNER_BUDGET_GRACE_SECONDS}s past its "
+                             f"{scanner.time_budget}s budget. Keeping {len(tenders_by_portal[index])} tenders found so far; "
+                             f"its daemon thread is dropped when the process exits.")
+
+    all_new_tenders: List[Tender] = []
+    report = [report_by_portal[index] for index in sorted(report_by_portal)]
+    for index in sorted(tenders_by_portal): # Config order, regardless of which scanner finished first
+        all_new_tenders.extend(tenders_by_portal[index])
+    for entry in report:
+        if entry["status"] != "skipped":
+            logger.info(f"Scanner {entry['portal']}: {entry['status']} in {entry['seconds']:.1f}s "
+                        f"(budget {entry['budget_seconds']}s), {entry['tenders']} new or amended tenders.")
+
     save_url_cache() # Save cache at the end
-    logger.info(f"All scanners finished. Total new tenders found: {len(all_new_tenders)}")
-    return all_new_tenders
+    save_robots_cache()
+    circuit_breaker.save()
+    if abandoned:
+        logger.warning(f"{abandoned} scanner(s) abandoned; leaving their DB connections open.")
+    else:
+        tender_db.close_all() # Checkpoints the WAL so the DB file is complete on its own
+    log_pool_stats("Acquisition")
+    totals = {key: sum(entry[key] for entry in report) for key in ("new", "amended", "unchanged")}
+    logger.info(f"All scanners finished. Tenders: {totals['new']} new, {totals['amended']} amended, "
+                f"{totals['unchanged']} unchanged. {len(all_new_tenders)} sent for analysis.")
+    return all_new_tenders, report
+
+def run_all_scanners() -> List[Tender]:
+    """Runs all configured scanners and aggregates new and amended tenders."""
+    tenders, _ = run_all_scanners_with_report()
+    return tenders
 
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
     logger.info("Starting data acquisition test run...")
     # Create dummy data folder if it doesn't exist
-    import os
     if not os.path.exists("data"):
         os.makedirs("data")
     
@@ -473,7 +1476,7 @@ if __name__ == '__main__':
         print("No new tenders found in this test run.")
 
     # Example: Querying the DB
-    conn = sqlite3.connect(PROCESSED_TENDERS_DB_PATH)
+    conn = tender_db.read_only_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT id, title, url, source, status FROM tenders ORDER BY first_seen_date DESC LIMIT 5")
     print("\n--- Last 5 Processed Tenders from DB ---")
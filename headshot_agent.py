@@ -9,15 +9,31 @@ import time
 import re
 import hashlib
 import csv
+import threading
+import queue
+import argparse
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, quote_plus, urlparse, unquote
 from collections import defaultdict, Counter
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, Future
 
 # --- NEW IMPORTS ---
 import feedparser # For RSS feeds
-import spacy      # For NLP
+# spaCy is imported on first use (get_nlp_model), so importing this module stays cheap
+
+from utils import politeness_scheduler, host_limiter, prefetch_robots, save_robots_cache
+from config import (
+    HEADSHOT_SCAN_WORKERS, HEADSHOT_DEAD_PATH_REPROBE_DAYS,
+    HEADSHOT_SIMHASH_MAX_DISTANCE, HEADSHOT_FINGERPRINT_RETENTION_DAYS,
+    HEADSHOT_NLP_BATCH_SIZE, HEADSHOT_NLP_N_PROCESS, HEADSHOT_NLP_BATCH_WAIT_SECONDS,
+    HEADSHOT_NLP_MODEL, HEADSHOT_NLP_EXCLUDED_PIPES, HTTP_CASSETTE_STATE_DIR
+)
+from http_client import create_session, log_pool_stats, is_replay_mode, is_cassette_mode, circuit_breaker, host_resolves, guarded_download
+from data_acquisition import (
+    load_url_cache, save_url_cache, get_conditional_headers,
+    record_response_validators, is_url_unchanged_this_run
+)
 
 # Configure logging
 logging.basicConfig(
@@ -26,17 +42,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger("HEADSHOT")
 
-# --- NLP Model Loading (do this once) ---
-NLP_MODEL = None
-try:
-    NLP_MODEL = spacy.load("en_core_web_sm") # Small English model
-    logger.info("SpaCy NLP model 'en_core_web_sm' loaded successfully.")
-except OSError:
-    logger.error("SpaCy model 'en_core_web_sm' not found. Please download it by running: python -m spacy download en_core_web_sm")
-    NLP_MODEL = None # Ensure it's None if loading fails
-
-# Database path
-DATABASE_PATH = "data/headshot_vault.db"
+# --- NLP Model Loading (lazy, once per process) ---
+_nlp_model = None
+_nlp_load_attempted = False
+_nlp_lock = threading.Lock()
+
+
+def load_nlp_model(exclude=HEADSHOT_NLP_EXCLUDED_PIPES):
+    """Loads the spaCy model without the pipes we don't use. Returns (model or None, load seconds)."""
+    started = time.perf_counter()
+    try:
+        import spacy
+        return spacy.load(HEADSHOT_NLP_MODEL, exclude=list(exclude)), time.perf_counter() - started
+    except ImportError:
+        logger.critical("CRITICAL: spaCy is not installed. Entity extraction is disabled; opportunities are scored without NLP.")
+    except OSError:
+        logger.critical(f"CRITICAL: SpaCy model '{HEADSHOT_NLP_MODEL}' not found. Please download it by running: python -m spacy download {HEADSHOT_NLP_MODEL}")
+    return None, time.perf_counter() - started
+
+
+def get_nlp_model():
+    """The shared NER-only spaCy pipeline, loaded on first use. None if spaCy or the model is unavailable."""
+    global _nlp_model, _nlp_load_attempted
+    with _nlp_lock:
+        if not _nlp_load_attempted:
+            _nlp_load_attempted = True
+            _nlp_model, seconds = load_nlp_model()
+            if _nlp_model is not None:
+                logger.info(f"SpaCy NLP model '{HEADSHOT_NLP_MODEL}' loaded in {seconds:.2f}s with pipes {_nlp_model.pipe_names}.")
+        return _nlp_model
+
+# Database path (a scratch DB in cassette replay, see config.HTTP_CASSETTE_STATE_DIR)
+DATABASE_PATH = os.path.join(HTTP_CASSETTE_STATE_DIR, "headshot_vault.db") if is_replay_mode() else "data/headshot_vault.db"
 DISCORD_WEBHOOK = os.environ.get("DISCORD_WEBHOOK", "")
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
 
@@ -190,6 +227,19 @@ class DatabaseManager:
             discovery_date TEXT, expiry_date TEXT, relevance_score REAL, company TEXT, data_json TEXT
         )'''
         self._execute_query(create_strategic_intelligence_table, commit=True)
+        # Learned procurement paths per host (see ProcurementPathCache)
+        create_procurement_paths_table = '''
+        CREATE TABLE IF NOT EXISTS procurement_paths (
+            host TEXT, path TEXT, status TEXT, hits INTEGER DEFAULT 0, misses INTEGER DEFAULT 0,
+            last_checked TEXT, PRIMARY KEY (host, path)
+        )'''
+        self._execute_query(create_procurement_paths_table, commit=True)
+        # SimHash of each page's cleaned text, for near-duplicate detection across runs (see PageFingerprintIndex)
+        create_page_fingerprints_table = '''
+        CREATE TABLE IF NOT EXISTS page_fingerprints (
+            url TEXT PRIMARY KEY, simhash TEXT, last_seen TEXT
+        )'''
+        self._execute_query(create_page_fingerprints_table, commit=True)
         logger.info(f"Database initialized/verified at {self.db_path}")
 
 
@@ -268,6 +318,43 @@ class DatabaseManager:
         query = 'UPDATE opportunities SET notification_sent = 1 WHERE id = ?'
         self._execute_query(query, (opportunity_id,), commit=True)
 
+    def get_procurement_paths(self):
+        rows = self._execute_query('SELECT host, path, status, hits, misses, last_checked FROM procurement_paths', fetch_all=True)
+        return [dict(row) for row in rows] if rows else []
+
+    def save_procurement_paths(self, rows):
+        """Upserts learned path rows in one transaction (called once at the end of a run)."""
+        if not rows:
+            return
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                conn.executemany('''INSERT OR REPLACE INTO procurement_paths (host, path, status, hits, misses, last_checked)
+                                    VALUES (:host, :path, :status, :hits, :misses, :last_checked)''', rows)
+        except sqlite3.Error as e:
+            logger.error(f"DATABASE_ERROR :: Saving {len(rows)} procurement paths :: Error: {e}")
+        finally:
+            conn.close()
+
+    def get_page_fingerprints(self, seen_since):
+        self._execute_query('DELETE FROM page_fingerprints WHERE last_seen < ?', (seen_since,), commit=True)
+        rows = self._execute_query('SELECT url, simhash FROM page_fingerprints', fetch_all=True)
+        return [(row["url"], int(row["simhash"], 16)) for row in rows] if rows else []
+
+    def save_page_fingerprints(self, rows):
+        """rows: (url, simhash int, last_seen) tuples, upserted in one transaction."""
+        if not rows:
+            return
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                conn.executemany('INSERT OR REPLACE INTO page_fingerprints (url, simhash, last_seen) VALUES (?, ?, ?)',
+                                 [(url, f"{simhash:016x}", last_seen) for url, simhash, last_seen in rows])
+        except sqlite3.Error as e:
+            logger.error(f"DATABASE_ERROR :: Saving {len(rows)} page fingerprints :: Error: {e}")
+        finally:
+            conn.close()
+
     def export_opportunities_csv(self, output_file="data/headshot_opportunities.csv"):
         # ... (Keep as is, it was good) ...
         conn = sqlite3.connect(self.db_path)
@@ -291,12 +378,329 @@ class DatabaseManager:
 
 
 # --- HeadshotAgent Class (Major Upgrades) ---
+class ProcurementPathCache:
+    """
+    Remembers, per host, which procurement paths returned useful content and which 404'd, across runs.
+    Statuses: "good" (page mentioned the search terms or linked to matching pages), "empty" (page loaded,
+    nothing relevant) and "dead" (404/410). Good paths are tried first, dead ones are skipped until
+    HEADSHOT_DEAD_PATH_REPROBE_DAYS have passed since they were last checked.
+    """
+    STATUS_ORDER = {"good": 0, None: 1, "empty": 2, "dead": 3}
+
+    def __init__(self, db, reprobe_days=HEADSHOT_DEAD_PATH_REPROBE_DAYS):
+        self.db = db
+        self.reprobe_after = timedelta(days=reprobe_days)
+        self._entries = {} # (host, path) -> row dict
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    @staticmethod
+    def _key(url):
+        parsed = urlparse(url)
+        return parsed.netloc.lower(), parsed.path.rstrip('/') or '/'
+
+    def load(self):
+        for row in self.db.get_procurement_paths():
+            self._entries[(row["host"], row["path"])] = row
+        logger.info(f"PATH_CACHE :: Loaded {len(self._entries)} learned procurement paths.")
+
+    def _is_skippable(self, entry, now):
+        if not entry or entry["status"] != "dead":
+            return False
+        try:
+            return now - datetime.fromisoformat(entry["last_checked"]) < self.reprobe_after
+        except (TypeError, ValueError):
+            return False
+
+    def is_dead(self, url):
+        with self._lock:
+            return self._is_skippable(self._entries.get(self._key(url)), datetime.now())
+
+    def plan(self, base_url, path_suffixes):
+        """Orders suffixes good -> unknown -> empty -> due re-probe, dropping dead paths that are not due yet."""
+        now = datetime.now()
+        planned = []
+        with self._lock:
+            for position, suffix in enumerate(path_suffixes):
+                entry = self._entries.get(self._key(urljoin(base_url, suffix.strip('/'))))
+                if self._is_skippable(entry, now):
+                    self.stats["skipped_dead"] += 1
+                    continue
+                status = entry["status"] if entry else None
+                planned.append((self.STATUS_ORDER.get(status, 1), -(entry["hits"] if entry else 0), position, suffix))
+        return [suffix for *_, suffix in sorted(planned)]
+
+    def record(self, url, outcome):
+        """outcome: "good", "empty", "dead" or "unchanged" (304 / same content as last run: keeps the learned status)."""
+        key = self._key(url)
+        with self._lock:
+            if key in self._dirty:
+                return # Already probed this run (an alternative-path retry of another task)
+            self.stats[outcome] += 1
+            entry = self._entries.setdefault(key, {"host": key[0], "path": key[1], "status": None, "hits": 0, "misses": 0, "last_checked": None})
+            if outcome in ("good", "unchanged"):
+                entry["hits"] += 1
+            else:
+                entry["misses"] += 1
+            if outcome != "unchanged" or entry["status"] is None:
+                entry["status"] = "good" if outcome == "unchanged" else outcome
+            entry["last_checked"] = datetime.now().isoformat()
+            self._dirty.add(key)
+
+    def save(self):
+        with self._lock:
+            rows = [dict(self._entries[key]) for key in self._dirty]
+            self._dirty.clear()
+        self.db.save_procurement_paths(rows)
+
+    def log_stats(self):
+        probes = sum(self.stats[outcome] for outcome in ("good", "unchanged", "empty", "dead"))
+        hits = self.stats["good"] + self.stats["unchanged"]
+        hit_rate = f"{hits / probes:.0%}" if probes else "n/a"
+        logger.info(f"PATH_CACHE :: {probes} path probes, hit rate {hit_rate} (good {self.stats['good']}, unchanged {self.stats['unchanged']}, "
+                    f"empty {self.stats['empty']}, dead {self.stats['dead']}); {self.stats['skipped_dead']} known-dead paths skipped.")
+
+
+def simhash(text, bits=64):
+    """64-bit SimHash of a text over word 3-shingles: similar texts get fingerprints a few bits apart."""
+    words = re.findall(r"\w+", text.lower())
+    shingles = Counter(" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2)))
+    weights = [0] * bits
+    for shingle, count in shingles.items():
+        feature = int.from_bytes(hashlib.md5(shingle.encode('utf-8')).digest()[:bits // 8], 'big')
+        for bit in range(bits):
+            weights[bit] += count if feature >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+class PageFingerprintIndex:
+    """
+    SimHash fingerprints of cleaned page text, kept across runs, so a page that only differs from one already
+    analysed by a timestamp, CSRF token or cookie banner skips extraction.
+    Fingerprints are split into max_distance + 1 bands: two fingerprints within max_distance bits share at least
+    one band exactly, so only same-band candidates are compared.
+    """
+    def __init__(self, db, max_distance=HEADSHOT_SIMHASH_MAX_DISTANCE, retention_days=HEADSHOT_FINGERPRINT_RETENTION_DAYS):
+        self.db = db
+        self.max_distance = max_distance
+        self.retention = timedelta(days=retention_days)
+        band_count = max_distance + 1
+        self._band_bits = [64 // band_count + (1 if i < 64 % band_count else 0) for i in range(band_count)]
+        self._fingerprints = {} # url -> simhash
+        self._bands = defaultdict(set) # (band index, band value) -> urls
+        self._previous_run = set() # urls loaded from the database
+        self._seen = {} # url -> simhash of pages analysed this run, written back by save()
+        self._matched = set() # urls whose stored fingerprint was matched this run (last_seen refreshed)
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def _band_keys(self, fingerprint):
+        shift = 0
+        for index, width in enumerate(self._band_bits):
+            yield index, (fingerprint >> shift) & ((1 << width) - 1)
+            shift += width
+
+    def _add(self, url, fingerprint):
+        old = self._fingerprints.get(url)
+        if old is not None:
+            for key in self._band_keys(old):
+                self._bands[key].discard(url)
+        self._fingerprints[url] = fingerprint
+        for key in self._band_keys(fingerprint):
+            self._bands[key].add(url)
+
+    def load(self):
+        for url, fingerprint in self.db.get_page_fingerprints((datetime.now() - self.retention).isoformat()):
+            self._add(url, fingerprint)
+            self._previous_run.add(url)
+        logger.info(f"FINGERPRINTS :: Loaded {len(self._fingerprints)} page fingerprints from earlier runs.")
+
+    def check_and_add(self, url, fingerprint):
+        """
+        Returns the URL of a near-identical page already analysed (this run or earlier), else None.
+        Only pages that are analysed (no match) are recorded: a skipped copy never replaces the analysed
+        fingerprint, so a page that drifts a little each run is compared with the version last analysed.
+        """
+        with self._lock:
+            match = None
+            candidates = set().union(*(self._bands.get(key, ()) for key in self._band_keys(fingerprint)))
+            for candidate in candidates:
+                if candidate in self._seen and candidate == url:
+                    continue
+                if bin(self._fingerprints[candidate] ^ fingerprint).count("1") <= self.max_distance:
+                    match = candidate
+                    break
+            if match is None:
+                self.stats["unique"] += 1
+                self._add(url, fingerprint)
+                self._seen[url] = fingerprint
+            else:
+                self.stats["near_duplicate_previous_run" if match in self._previous_run and match not in self._seen else "near_duplicate_this_run"] += 1
+                self._matched.add(match) # Still current: keep it past the retention window
+            return match
+
+    def save(self):
+        """Persists the fingerprints analysed this run and refreshes last_seen of the baselines that were matched."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            urls = set(self._seen) | self._matched
+            rows = [(url, self._fingerprints[url], now) for url in urls]
+        self.db.save_page_fingerprints(rows)
+
+    def log_stats(self):
+        logger.info(f"FINGERPRINTS :: {self.stats['unique']} new pages analysed; near-duplicates skipped: "
+                    f"{self.stats['near_duplicate_this_run']} within this run, {self.stats['near_duplicate_previous_run']} seen on earlier runs.")
+
+
+NLP_MAX_CHARS = 100000 # Process up to 100k chars per page for performance
+
+
+def entities_from_doc(doc):
+    """ORG, MONEY, DATE, GPE (locations) from a spaCy doc, deduplicated and sorted."""
+    entities = {"organizations": [], "money": [], "dates": [], "locations": []}
+    for ent in doc.ents:
+        if ent.label_ == "ORG":
+            entities["organizations"].append(ent.text.strip())
+        elif ent.label_ == "MONEY":
+            entities["money"].append(ent.text.strip())
+        elif ent.label_ == "DATE":
+            entities["dates"].append(ent.text.strip())
+        elif ent.label_ == "GPE": # Geopolitical Entity (cities, countries)
+            entities["locations"].append(ent.text.strip())
+    for key in entities: entities[key] = sorted(list(set(entities[key])))
+    return entities
+
+
+class BatchedEntityExtractor:
+    """
+    Entity-extraction stage shared by all scan threads. Callers hand in cleaned text and block; a single worker
+    thread groups pending texts into batches of up to batch_size (waiting at most max_wait for a batch to fill)
+    and runs them through nlp.pipe, so the model is driven from one thread with batched inference.
+    """
+    def __init__(self, nlp, batch_size=HEADSHOT_NLP_BATCH_SIZE, n_process=HEADSHOT_NLP_N_PROCESS, max_wait=HEADSHOT_NLP_BATCH_WAIT_SECONDS):
+        self.nlp = nlp
+        self.batch_size = max(1, batch_size)
+        self.n_process = max(1, n_process)
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self.stats = Counter()
+        self.busy_seconds = 0.0
+
+    def extract(self, text):
+        """Entities for one text; waits for the batch it lands in to be processed."""
+        future = Future()
+        self._queue.put((text[:NLP_MAX_CHARS], future))
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="nlp-batcher", daemon=True)
+                self._worker.start()
+        return future.result()
+
+    def _next_batch(self):
+        """Returns (batch, stop): up to batch_size queued items, and whether close()'s sentinel was reached."""
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            try:
+                if deadline is None: # Block until the first text of the batch arrives
+                    item = self._queue.get()
+                    deadline = time.monotonic() + self.max_wait
+                else:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            self._process(batch)
+
+    def _process(self, batch):
+        if not batch:
+            return
+        texts = [text for text, _ in batch]
+        started = time.perf_counter()
+        try:
+            docs = list(self.nlp.pipe(texts, batch_size=self.batch_size, n_process=self.n_process))
+        except Exception as e:
+            logger.error(f"SPACY_ERROR :: Batch of {len(texts)} failed ({e}); retrying one document at a time.")
+            docs = []
+            for text in texts:
+                try:
+                    docs.append(self.nlp(text))
+                except Exception as doc_error:
+                    logger.error(f"SPACY_ERROR :: Error extracting entities: {doc_error}")
+                    docs.append(None)
+        self.busy_seconds += time.perf_counter() - started
+        self.stats["batches"] += 1
+        self.stats["docs"] += len(texts)
+        for doc, (_, future) in zip(docs, batch):
+            future.set_result(entities_from_doc(doc) if doc is not None else {"organizations": [], "money": [], "dates": [], "locations": []})
+
+    def close(self):
+        """Processes whatever is still queued, then stops the worker thread."""
+        with self._start_lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+    def log_stats(self):
+        docs, batches = self.stats["docs"], self.stats["batches"]
+        rate = f"{docs / self.busy_seconds:.1f} docs/s" if self.busy_seconds else "n/a"
+        logger.info(f"NLP_BATCHING :: {docs} docs in {batches} batches (avg {docs / batches if batches else 0:.1f}/batch, "
+                    f"batch_size={self.batch_size}, n_process={self.n_process}), {self.busy_seconds:.1f}s in spaCy, {rate}.")
+
+
+def benchmark_entity_extraction(nlp, texts, batch_sizes=(1, 8, 32), n_process_options=None):
+    """Logs docs/second for per-document nlp() calls versus nlp.pipe at several batch sizes and process counts."""
+    texts = [text[:NLP_MAX_CHARS] for text in texts]
+    if n_process_options is None:
+        n_process_options = sorted({1, os.cpu_count() or 1})
+    results = []
+    started = time.perf_counter()
+    for text in texts:
+        entities_from_doc(nlp(text))
+    results.append(("sequential nlp()", len(texts) / (time.perf_counter() - started)))
+    for n_process in n_process_options:
+        for batch_size in batch_sizes:
+            started = time.perf_counter()
+            for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+                entities_from_doc(doc)
+            results.append((f"nlp.pipe batch_size={batch_size} n_process={n_process}", len(texts) / (time.perf_counter() - started)))
+    baseline = results[0][1]
+    for label, docs_per_second in results:
+        logger.info(f"NLP_BENCHMARK :: {label:<40} {docs_per_second:8.1f} docs/s ({docs_per_second / baseline:.2f}x)")
+    return results
+
+
+def benchmark_nlp_loading(texts):
+    """Logs load time and per-doc latency of the full pipeline versus the trimmed NER-only one."""
+    for label, exclude in (("full pipeline", []), ("trimmed (NER only)", HEADSHOT_NLP_EXCLUDED_PIPES)):
+        nlp, load_seconds = load_nlp_model(exclude=exclude)
+        if nlp is None:
+            return
+        started = time.perf_counter()
+        for text in texts:
+            nlp(text[:NLP_MAX_CHARS])
+        per_doc_ms = (time.perf_counter() - started) * 1000 / max(1, len(texts))
+        logger.info(f"NLP_BENCHMARK :: {label:<20} load {load_seconds:.2f}s, {per_doc_ms:.1f} ms/doc, pipes {nlp.pipe_names}")
+
+
 class HeadshotAgent:
     def __init__(self):
         self.db = DatabaseManager()
-        self.nlp = NLP_MODEL # Use the globally loaded NLP model
-        self.session = requests.Session() # Use a session for potential cookie persistence, connection pooling
-        self.session.headers.update({"User-Agent": self.get_random_user_agent()})
+        self._entity_extractor = None # Created with the model on the first page that needs entities
+        self._entity_extractor_lock = threading.Lock()
+        self.session = create_session(self.get_random_user_agent()) # Own cookies/UA, shared keep-alive connection pool
 
         # --- Target Lists (Keep as is or update URLs manually) ---
         self.local_authority_targets = COMPANY_PROFILES_TARGETS_CONFIG.get("local_authority_targets", [])
@@ -310,7 +714,27 @@ class HeadshotAgent:
             # Add more specific industry news RSS feeds if available
         }
         self.common_procurement_paths = ["/procurement", "/tenders", "/contracts", "/supplying", "/working-with-us", "/business/procurement", "/business/tenders-and-contracts"]
-
+        # Pages fetched, cleaned and entity-extracted once per run and shared by every company and scan (see _get_page)
+        self._page_cache = {} # url -> page dict, or None if the fetch failed / page unchanged
+        self._page_locks = {} # url -> Lock, so concurrent scans wait for one fetch instead of duplicating it
+        self._page_cache_lock = threading.Lock()
+        self.page_cache_stats = {"fetched": 0, "reused": 0, "nlp_runs": 0, "nlp_reused": 0}
+        self.path_cache = ProcurementPathCache(self.db)
+        self.fingerprints = PageFingerprintIndex(self.db)
+        self._failed_status = {} # url -> HTTP status of the last request that failed permanently (404 marks a path dead)
+
+
+    @property
+    def nlp(self):
+        return get_nlp_model() # Loaded lazily, shared by every agent in the process
+
+    @property
+    def entity_extractor(self):
+        """Batches spaCy calls from all scan threads; None if the model is unavailable."""
+        with self._entity_extractor_lock:
+            if self._entity_extractor is None and self.nlp is not None:
+                self._entity_extractor = BatchedEntityExtractor(self.nlp)
+            return self._entity_extractor
 
     def get_random_user_agent(self):
         return random.choice(USER_AGENTS)
@@ -324,18 +748,38 @@ class HeadshotAgent:
             current_headers["Referer"] = referer_url
 
         for attempt in range(max_retries):
+            if not circuit_breaker.allow_request(url):
+                logger.warning(f"CIRCUIT_OPEN_SKIP :: URL: {url} :: Host failed to connect repeatedly. Skipping.")
+                return None
             try:
-                logger.debug(f"Requesting (Attempt {attempt+1}/{max_retries}): {method} {url} with params {params}")
-                response = self.session.request(
-                    method=method, url=url, headers=current_headers, data=data, params=params,
-                    timeout=30, verify=True, # Keep verify=True for security, handle SSL errors specifically
-                    allow_redirects=allow_redirects
-                )
-                response.raise_for_status() # Raises HTTPError for bad responses (4XX or 5XX)
-                delay = random.uniform(base_delay, base_delay * 2) # Random delay after success
-                logger.debug(f"Request successful, sleeping for {delay:.2f}s")
-                time.sleep(delay)
-                return response
+                # At most MAX_REQUESTS_PER_HOST requests in flight per host, however many scan tasks target it
+                with host_limiter.slot(url):
+                    # Per-host spacing (random base_delay..2*base_delay, or robots.txt Crawl-delay if larger).
+                    # Other hosts are not held up by this wait.
+                    politeness_scheduler.wait_for_turn(url, min_delay=random.uniform(base_delay, base_delay * 2),
+                                                       user_agent=current_headers.get("User-Agent", "*"))
+                    logger.debug(f"Requesting (Attempt {attempt+1}/{max_retries}): {method} {url} with params {params}")
+                    try:
+                        response = self.session.request(
+                            method=method, url=url, headers=current_headers, data=data, params=params,
+                            timeout=30, verify=True, # Keep verify=True for security, handle SSL errors specifically
+                            allow_redirects=allow_redirects,
+                            stream=True # Body is read by guarded_download, after the Content-Type/size checks
+                        )
+                    except requests.exceptions.RequestException as e:
+                        if circuit_breaker.record_failure(url, e):
+                            logger.error(f"WEB_REQUEST_FAILED_PERMANENTLY :: URL: {url} :: Host circuit opened after: {str(e)[:200]}")
+                            return None # No point backing off and retrying a host that is down
+                        raise
+                    circuit_breaker.record_success(url)
+                    try:
+                        response.raise_for_status() # Raises HTTPError for bad responses (4XX or 5XX)
+                    except requests.exceptions.HTTPError:
+                        response.close()
+                        raise
+                    if response.status_code != 304 and not guarded_download(response, response.url or url):
+                        return None # PDF, image or oversized page: not worth retrying
+                    return response
             except requests.exceptions.SSLError as e:
                 logger.error(f"SSL_ERROR :: URL: {url} :: Error: {e}")
                 # For specific, known problematic sites, you *could* retry with verify=False, but it's risky.
@@ -345,8 +789,13 @@ class HeadshotAgent:
                 error_type = type(e).__name__
                 status_code = e.response.status_code if e.response is not None else "N/A"
                 logger.warning(f"REQUEST_FAILED (Attempt {attempt+1}/{max_retries}) :: URL: {url} :: Status: {status_code} :: ErrorType: {error_type} :: Error: {str(e)[:200]}")
+                if status_code in (404, 410): # Missing page: retrying will not bring it back
+                    self._failed_status[url] = status_code
+                    return None
                 if attempt + 1 < max_retries:
                     sleep_time = (base_delay * 2) * (2 ** attempt) + random.uniform(0,1) # Exponential backoff
+                    if is_replay_mode():
+                        sleep_time = 0 # Cassette replay: the outcome is fixed, waiting only skews timings
                     logger.info(f"Retrying in {sleep_time:.2f} seconds...")
                     time.sleep(sleep_time)
                 else:
@@ -354,6 +803,92 @@ class HeadshotAgent:
                     return None
         return None # Should be unreachable if loop completes, but as a fallback
 
+    def fetch_if_changed(self, url, referer_url=None):
+        """
+        Conditional GET against the shared URL cache (ETag / Last-Modified / content hash).
+        Returns the response, or None if the request failed or the page is unchanged since the last run.
+        """
+        if is_url_unchanged_this_run(url):
+            return None
+        response = self.request_with_retry(url, headers=get_conditional_headers(url), referer_url=referer_url)
+        if response is None:
+            return None
+        if record_response_validators(url, response):
+            logger.info(f"UNCHANGED_PAGE :: {url} not modified since last run, skipping extraction.")
+            return None
+        return response
+
+    def _get_page(self, url, referer_url=None):
+        """
+        Fetches, parses and cleans a page once per run.
+        Returns {"url", "text", "links", "content_hash"} or None if the request failed or the page is unchanged
+        since the last run. Later calls for the same URL (other companies, other scans) get the cached result.
+        """
+        with self._page_cache_lock:
+            if url in self._page_cache:
+                self.page_cache_stats["reused"] += 1
+                return self._page_cache[url]
+            url_lock = self._page_locks.setdefault(url, threading.Lock())
+        with url_lock:
+            if url in self._page_cache: # Fetched by another thread while we waited
+                with self._page_cache_lock:
+                    self.page_cache_stats["reused"] += 1
+                return self._page_cache[url]
+            page = None
+            response = self.fetch_if_changed(url, referer_url=referer_url)
+            if response is not None:
+                soup = BeautifulSoup(response.text, 'html.parser')
+                text = self._get_clean_text(soup.find('main') or soup.find('article') or soup.body)
+                links = []
+                for link_tag in soup.find_all('a', href=True):
+                    href = link_tag.get('href', '').strip()
+                    if not href or href.startswith('#') or href.startswith('javascript:') or href.startswith("mailto:"):
+                        continue
+                    links.append({"href": href, "url": urljoin(url, href), "text": link_tag.get_text(strip=True)})
+                page = {
+                    "url": url, "text": text, "links": links,
+                    "content_hash": hashlib.md5(response.text.encode('utf-8')).hexdigest(),
+                    "entities": None, "entities_lock": threading.Lock(),
+                    # Same text up to boilerplate as a page already analysed: links are still followed, extraction is skipped
+                    "near_duplicate_of": self.fingerprints.check_and_add(url, simhash(text)) if text else None
+                }
+            with self._page_cache_lock:
+                self._page_cache[url] = page
+                if page is not None:
+                    self.page_cache_stats["fetched"] += 1
+            return page
+
+    def _get_page_entities(self, page):
+        """spaCy entities for a cached page, extracted on first use and reused for every company."""
+        with page["entities_lock"]:
+            if page["entities"] is None:
+                page["entities"] = self._extract_entities_with_spacy(page["text"])
+                self.page_cache_stats["nlp_runs"] += 1
+            else:
+                self.page_cache_stats["nlp_reused"] += 1
+            return page["entities"]
+
+    def _score_page_for_companies(self, page, company_profile_names, source_name, buyer_name_hint, min_score, log_label):
+        """Runs the per-company scoring over one shared page and saves the opportunities that pass min_score."""
+        opportunities = []
+        text = page["text"]
+        if not text:
+            return opportunities
+        if page["near_duplicate_of"]:
+            logger.info(f"NEAR_DUPLICATE_PAGE :: Skipping extraction for {page['url']}: matches {page['near_duplicate_of']}")
+            return opportunities
+        text_lower = text.lower()
+        for company_name in company_profile_names:
+            if not any(term.lower() in text_lower for term in COMPANY_PROFILES[company_name]["keywords"]):
+                continue
+            opp = self.extract_headshot_opportunity(text, company_name, source_name, page["url"], buyer_name_hint,
+                                                    extracted_entities=self._get_page_entities(page))
+            if opp and opp.get("headshot_score", 0) >= min_score:
+                self.db.save_opportunity(opp)
+                opportunities.append(opp)
+                logger.info(f"{log_label} :: {company_name} from {source_name} ({page['url']}) - Score: {opp['headshot_score']}")
+        return opportunities
+
     def _get_clean_text(self, soup_element):
         """Extracts and cleans text from a BeautifulSoup element."""
         if not soup_element:
@@ -366,29 +901,21 @@ class HeadshotAgent:
         return text
 
     def _extract_entities_with_spacy(self, text):
-        """Uses spaCy to extract ORG, MONEY, DATE, GPE (Locations)."""
-        entities = {"organizations": [], "money": [], "dates": [], "locations": []}
-        if not self.nlp or not text:
-            return entities
+        """Uses spaCy to extract ORG, MONEY, DATE, GPE (Locations), batched with other threads' pages via nlp.pipe."""
+        if not self.entity_extractor or not text:
+            return {"organizations": [], "money": [], "dates": [], "locations": []}
         try:
-            doc = self.nlp(text[:100000]) # Process up to 100k chars for performance
-            for ent in doc.ents:
-                if ent.label_ == "ORG":
-                    entities["organizations"].append(ent.text.strip())
-                elif ent.label_ == "MONEY":
-                    entities["money"].append(ent.text.strip())
-                elif ent.label_ == "DATE":
-                    entities["dates"].append(ent.text.strip())
-                elif ent.label_ == "GPE": # Geopolitical Entity (cities, countries)
-                    entities["locations"].append(ent.text.strip())
-            # Deduplicate
-            for key in entities: entities[key] = sorted(list(set(entities[key])))
+            return self.entity_extractor.extract(text)
         except Exception as e:
             logger.error(f"SPACY_ERROR :: Error extracting entities: {e}", exc_info=False) # Keep log concise
-        return entities
+            return {"organizations": [], "money": [], "dates": [], "locations": []}
 
     # --- extract_headshot_opportunity (Major NLP and Logic Upgrade) ---
-    def extract_headshot_opportunity(self, text_content, company_profile_name, source, url, buyer_name_hint=None):
+    def extract_headshot_opportunity(self, text_content, company_profile_name, source, url, buyer_name_hint=None, extracted_entities=None):
+        """
+        Scores one page of text for one company.
+        Pass `extracted_entities` (from _get_page_entities) to reuse entities already extracted for another company.
+        """
         opp_id_text = url + text_content[:500] # Use URL and some text for ID
         opportunity_id = f"{company_profile_name}-{hashlib.md5(opp_id_text.encode('utf-8')).hexdigest()[:12]}"
         
@@ -404,7 +931,8 @@ class HeadshotAgent:
             return None # Cannot process empty content
 
         # 1. NLP Entity Extraction
-        extracted_entities = self._extract_entities_with_spacy(text_content)
+        if extracted_entities is None:
+            extracted_entities = self._extract_entities_with_spacy(text_content)
         opportunity["data_json"]["extracted_entities"] = extracted_entities
 
         # 2. Title Extraction (Improved)
@@ -540,14 +1068,54 @@ class HeadshotAgent:
         return opportunity
 
 
-    def _scan_website_for_links(self, base_url, search_terms, company_profile_name, source_name, buyer_name_hint, path_suffixes=None, referer_url=None):
-        """Generic helper to scan a base URL (and common paths) for links matching search terms."""
+    @staticmethod
+    def _page_mentions(page, search_terms):
+        return bool(page["text"]) and any(st.lower() in page["text"].lower() for st in search_terms)
+
+    @staticmethod
+    def _matching_links(page, base_url, search_terms):
+        links_found = []
+        for link in page["links"]:
+            href, link_text, full_url = link["href"], link["text"], link["url"]
+            # Check if link text or URL itself looks like an opportunity
+            if any(term.lower() in link_text.lower() for term in search_terms) or \
+               any(term.lower() in href.lower() for term in search_terms):
+                # Avoid crawling too deep or off-site excessively
+                if urlparse(full_url).netloc == urlparse(base_url).netloc or "gov.uk" in full_url or "nhs.uk" in full_url:
+                    links_found.append({"url": full_url, "text": link_text, "source_page_url": page["url"]})
+        return links_found
+
+    def _record_path_outcome(self, url, page, base_url, search_terms):
+        """Feeds the learned path cache: useful page, empty page, 404, or unchanged since last run."""
+        if page:
+            useful = self._page_mentions(page, search_terms) or self._matching_links(page, base_url, search_terms)
+            self.path_cache.record(url, "good" if useful else "empty")
+        elif is_url_unchanged_this_run(url):
+            self.path_cache.record(url, "unchanged")
+        elif self._failed_status.get(url) in (404, 410):
+            self.path_cache.record(url, "dead")
+        # Timeouts, 5xx, robots/circuit skips: says nothing about the path itself
+
+    def _scan_website_for_links(self, base_url, search_terms, company_profile_names, source_name, buyer_name_hint, path_suffixes=None, referer_url=None, scanned_page_content=None):
+        """
+        Generic helper to scan a base URL (and common paths) for links matching search terms.
+        Each page is fetched and analysed once (see _get_page) and then scored for every company in
+        `company_profile_names` (a single company name is accepted too).
+        Pass the same `scanned_page_content` set to every per-path task of a site so aliases of one page are scored once.
+        """
+        if isinstance(company_profile_names, str):
+            company_profile_names = [company_profile_names]
         discovered_opportunities = []
         if path_suffixes is None:
             path_suffixes = [""] # Scan base_url itself if no suffixes
 
+        if not host_resolves(base_url):
+            logger.warning(f"DNS_UNRESOLVED :: Skipping {len(path_suffixes)} paths of {base_url} for {source_name}: host does not resolve.")
+            return discovered_opportunities
+
         urls_to_scan = [urljoin(base_url, suffix.strip('/')) for suffix in path_suffixes]
-        scanned_page_content = set() # To avoid rescanning identical page content from different URL aliases
+        if scanned_page_content is None:
+            scanned_page_content = set() # To avoid rescanning identical page content from different URL aliases
 
         for page_url in urls_to_scan:
             if not page_url.startswith("http"): # Ensure valid URL
@@ -555,148 +1123,146 @@ class HeadshotAgent:
                 continue
 
             logger.info(f"SCANNING_PAGE :: URL: {page_url} for {source_name}")
-            response = self.request_with_retry(page_url, referer_url=referer_url or base_url) # Pass referer
-            if not response:
-                # Try one common alternative if the direct path failed
+            page = self._get_page(page_url, referer_url=referer_url or base_url) # Pass referer
+            self._record_path_outcome(page_url, page, base_url, search_terms)
+            if not page and is_url_unchanged_this_run(page_url):
+                continue # 304 / identical content: already analysed in a previous run
+            if not page:
+                # Try one common alternative if the direct path failed (skipping paths known to 404)
                 if any(p in page_url for p in self.common_procurement_paths): # Only if it was a common path
-                    for alt_suffix in random.sample(self.common_procurement_paths, 2): # Try 2 random alternatives
+                    # Seeded per URL under the cassette, so a replay tries the alternatives the recording did
+                    rng = random.Random(page_url) if is_cassette_mode() else random
+                    shuffled = rng.sample(self.common_procurement_paths, len(self.common_procurement_paths))
+                    alt_candidates = [alt for alt in shuffled if not self.path_cache.is_dead(urljoin(base_url, alt.strip('/')))]
+                    for alt_suffix in alt_candidates[:2]: # Try 2 random alternatives
                         alt_url = urljoin(base_url, alt_suffix.strip('/'))
                         if alt_url != page_url:
                             logger.info(f"RETRY_ALT_PATH :: Original failed, trying: {alt_url}")
-                            response = self.request_with_retry(alt_url, referer_url=base_url)
-                            if response:
+                            page = self._get_page(alt_url, referer_url=base_url)
+                            self._record_path_outcome(alt_url, page, base_url, search_terms)
+                            if page:
                                 page_url = alt_url # Update if successful
                                 break # Found one
-                if not response:
+                if not page:
                     continue # Still no response
 
-            page_content_hash = hashlib.md5(response.text.encode('utf-8')).hexdigest()
-            if page_content_hash in scanned_page_content:
+            with self._page_cache_lock: # The set may be shared by concurrent tasks for the same site
+                duplicate = page["content_hash"] in scanned_page_content
+                scanned_page_content.add(page["content_hash"])
+            if duplicate:
                 logger.info(f"DUPLICATE_PAGE_CONTENT :: Skipping already processed content from {page_url}")
                 continue
-            scanned_page_content.add(page_content_hash)
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
             # Option 1: Extract opportunities directly from this page's text
-            main_page_text = self._get_clean_text(soup.find('main') or soup.find('article') or soup.body)
-            if main_page_text and any(term.lower() in main_page_text.lower() for term in COMPANY_PROFILES[company_profile_name]["keywords"]):
-                 if any(st.lower() in main_page_text.lower() for st in search_terms): # "tender", "opportunity"
-                    opp = self.extract_headshot_opportunity(main_page_text, company_profile_name, source_name, page_url, buyer_name_hint)
-                    if opp and opp.get("headshot_score",0) >= 40: # Lower initial threshold for direct page content
-                        self.db.save_opportunity(opp)
-                        discovered_opportunities.append(opp)
-                        logger.info(f"OPP_FROM_PAGE :: {company_profile_name} from {source_name} ({page_url}) - Score: {opp['headshot_score']}")
+            if self._page_mentions(page, search_terms): # "tender", "opportunity"
+                discovered_opportunities.extend(self._score_page_for_companies(
+                    page, company_profile_names, source_name, buyer_name_hint, min_score=40, log_label="OPP_FROM_PAGE")) # Lower initial threshold for direct page content
 
             # Option 2: Find links on this page and scan those
-            links_found = []
-            for link_tag in soup.find_all('a', href=True):
-                href = link_tag.get('href', '').strip()
-                link_text = link_tag.get_text(strip=True)
-                
-                if not href or href.startswith('#') or href.startswith('javascript:'):
-                    continue
-                if href.startswith("mailto:"): # Skip mailto links early
-                    continue
-
-                full_url = urljoin(page_url, href) # Make absolute
-
-                # Check if link text or URL itself looks like an opportunity
-                if any(term.lower() in link_text.lower() for term in search_terms) or \
-                   any(term.lower() in href.lower() for term in search_terms):
-                    # Avoid crawling too deep or off-site excessively
-                    if urlparse(full_url).netloc == urlparse(base_url).netloc or "gov.uk" in full_url or "nhs.uk" in full_url:
-                        links_found.append({"url": full_url, "text": link_text, "source_page_url": page_url})
+            links_found = self._matching_links(page, base_url, search_terms)
             
             for link_info in links_found[:5]: # Limit linked pages to process
                 if link_info["url"] == page_url: continue # Avoid self-loop
                 logger.info(f"SCANNING_LINKED_PAGE :: URL: {link_info['url']} (from {link_info['text']})")
-                link_response = self.request_with_retry(link_info["url"], referer_url=link_info["source_page_url"])
-                if link_response:
-                    link_soup = BeautifulSoup(link_response.text, 'html.parser')
-                    link_page_text = self._get_clean_text(link_soup.find('main') or link_soup.find('article') or link_soup.body)
-                    if link_page_text and any(term.lower() in link_page_text.lower() for term in COMPANY_PROFILES[company_profile_name]["keywords"]):
-                        opp = self.extract_headshot_opportunity(link_page_text, company_profile_name, source_name, link_info["url"], buyer_name_hint)
-                        if opp and opp.get("headshot_score",0) >= 50:
-                            self.db.save_opportunity(opp)
-                            discovered_opportunities.append(opp)
-                            logger.info(f"OPP_FROM_LINK :: {company_profile_name} from {source_name} ({link_info['url']}) - Score: {opp['headshot_score']}")
+                link_page = self._get_page(link_info["url"], referer_url=link_info["source_page_url"])
+                if link_page:
+                    discovered_opportunities.extend(self._score_page_for_companies(
+                        link_page, company_profile_names, source_name, buyer_name_hint, min_score=50, log_label="OPP_FROM_LINK"))
         return discovered_opportunities
 
-    def scan_local_authorities(self):
-        logger.info("Scanning local authority websites...")
-        all_opps = []
+    def _local_authority_site_scans(self):
         for authority in self.local_authority_targets:
-            companies_to_check = ["EzziUK", "RehabilityUK"] if authority["company"] == "both" else [authority["company"]]
-            for company_name in companies_to_check:
-                opps = self._scan_website_for_links(
-                    base_url=authority["url"],
-                    search_terms=["tender", "contract", "opportunity", "procurement", "e-tendering", "supplying"],
-                    company_profile_name=company_name,
-                    source_name=f"Local Authority: {authority['name']}",
-                    buyer_name_hint=authority['name'],
-                    path_suffixes=self.common_procurement_paths + ["/business", ""] # Check various common paths
-                )
-                all_opps.extend(opps)
-        logger.info(f"Local authority scan discovered {len(all_opps)} potential opportunities.")
-        return all_opps
+            yield dict(
+                base_url=authority["url"],
+                search_terms=["tender", "contract", "opportunity", "procurement", "e-tendering", "supplying"],
+                company_profile_names=["EzziUK", "RehabilityUK"] if authority["company"] == "both" else [authority["company"]], # One crawl, scored for each company
+                source_name=f"Local Authority: {authority['name']}",
+                buyer_name_hint=authority['name'],
+                path_suffixes=self.common_procurement_paths + ["/business", ""] # Check various common paths
+            )
 
-    # ... (scan_nhs_commissioners and scan_housing_associations would use _scan_website_for_links similarly) ...
-    def scan_nhs_commissioners(self):
-        logger.info("Scanning NHS & care commissioners...")
-        all_opps = []
+    def _nhs_site_scans(self):
         for nhs_org in self.nhs_targets:
             # NHS sites often use "commissioning", "provider", "services"
-            opps = self._scan_website_for_links(
+            # Strategic plans (/strategies, /plans) are mostly PDFs, which the download guard skips
+            yield dict(
                 base_url=nhs_org["url"],
                 search_terms=["tender", "contract", "opportunity", "procurement", "commissioning", "services", "provider", "framework"],
-                company_profile_name=nhs_org["company"], # Should be "RehabilityUK" mostly
+                company_profile_names=[nhs_org["company"]], # Should be "RehabilityUK" mostly
                 source_name=f"NHS Org: {nhs_org['name']}",
                 buyer_name_hint=nhs_org['name'],
                 path_suffixes=self.common_procurement_paths + ["/commissioning-intentions", "/publications", "/about-us/corporate-information", ""]
             )
-            all_opps.extend(opps)
-             # Also check for strategic plans (simplified for now, more advanced parsing needed for PDFs)
-            for strat_suffix in ["/strategies", "/plans", "/publications"]:
-                strat_url = urljoin(nhs_org["url"], strat_suffix)
-                # ... (logic to find PDF/doc links and extract text or summarize if possible - complex) ...
-        logger.info(f"NHS commissioner scan discovered {len(all_opps)} potential opportunities.")
-        return all_opps
 
-    def scan_housing_associations(self):
-        logger.info("Scanning housing associations...")
-        all_opps = []
+    def _housing_association_site_scans(self):
         for ha in self.housing_association_targets:
-            opps = self._scan_website_for_links(
+            yield dict(
                 base_url=ha["url"],
                 search_terms=["tender", "contract", "opportunity", "procurement", "works", "maintenance", "development"],
-                company_profile_name=ha["company"], # Should be "EzziUK" mostly
+                company_profile_names=[ha["company"]], # Should be "EzziUK" mostly
                 source_name=f"Housing Assoc: {ha['name']}",
                 buyer_name_hint=ha['name'],
                 path_suffixes=self.common_procurement_paths + ["/development-opportunities", "/news", ""]
             )
-            all_opps.extend(opps)
-        logger.info(f"Housing association scan discovered {len(all_opps)} potential opportunities.")
-        return all_opps
 
-    def scan_premium_frameworks(self): # Uses _scan_website_for_links too
-        logger.info("Scanning premium framework websites...")
-        all_opps = []
+    def _premium_framework_site_scans(self):
         for source_info in self.premium_sources:
-            # Frameworks are relevant to all companies, check keywords
-            for company_name in COMPANY_PROFILES.keys():
-                opps = self._scan_website_for_links(
-                    base_url=source_info["url"],
-                    search_terms=["framework", "direct award", "call-off", "dynamic purchasing system", "dps", "opportunities"],
-                    company_profile_name=company_name,
-                    source_name=f"Premium Framework: {source_info['name']}",
-                    buyer_name_hint=source_info['name'], # The framework org itself
-                    path_suffixes=["/frameworks", "/opportunities", "/solutions", ""]
-                )
-                all_opps.extend(opps)
-        logger.info(f"Premium framework scan discovered {len(all_opps)} potential opportunities.")
+            # Frameworks are relevant to all companies: crawl once, score for each
+            yield dict(
+                base_url=source_info["url"],
+                search_terms=["framework", "direct award", "call-off", "dynamic purchasing system", "dps", "opportunities"],
+                company_profile_names=list(COMPANY_PROFILES.keys()),
+                source_name=f"Premium Framework: {source_info['name']}",
+                buyer_name_hint=source_info['name'], # The framework org itself
+                path_suffixes=["/frameworks", "/opportunities", "/solutions", ""]
+            )
+
+    def _run_site_scans(self, site_scans, label):
+        """Sequential scan of one category (the full run schedules per-path tasks instead, see run_headshot_scan)."""
+        logger.info(f"Scanning {label} websites...")
+        all_opps = []
+        for site_scan in site_scans:
+            site_scan["path_suffixes"] = self.path_cache.plan(site_scan["base_url"], site_scan["path_suffixes"]) # Good paths first, dead ones dropped
+            all_opps.extend(self._scan_website_for_links(**site_scan))
+        logger.info(f"{label} scan discovered {len(all_opps)} potential opportunities.")
         return all_opps
 
+    def scan_local_authorities(self):
+        return self._run_site_scans(self._local_authority_site_scans(), "Local authority")
+
+    def scan_nhs_commissioners(self):
+        return self._run_site_scans(self._nhs_site_scans(), "NHS commissioner")
+
+    def scan_housing_associations(self):
+        return self._run_site_scans(self._housing_association_site_scans(), "Housing association")
+
+    def scan_premium_frameworks(self):
+        return self._run_site_scans(self._premium_framework_site_scans(), "Premium framework")
+
+    def _site_scan_tasks(self):
+        """
+        Splits every category's site scans into one task per (site, path).
+        Tasks are ordered path-first, so consecutive tasks hit different hosts and the per-host cap rarely stalls a worker.
+        """
+        categories = [
+            ("Local Authorities", self._local_authority_site_scans()),
+            ("NHS Commissioners", self._nhs_site_scans()),
+            ("Housing Associations", self._housing_association_site_scans()),
+            ("Premium Frameworks", self._premium_framework_site_scans()),
+        ]
+        per_site = []
+        for category, site_scans in categories:
+            for site_scan in site_scans:
+                scanned_page_content = set() # Shared by the site's path tasks
+                per_site.append([
+                    (category, dict(site_scan, path_suffixes=[suffix], scanned_page_content=scanned_page_content))
+                    for suffix in self.path_cache.plan(site_scan["base_url"], site_scan["path_suffixes"]) # Good paths first, dead ones dropped
+                ])
+        tasks = []
+        for depth in range(max((len(paths) for paths in per_site), default=0)):
+            tasks.extend(paths[depth] for paths in per_site if depth < len(paths))
+        return tasks
+
 
     # --- scan_competitor_failures (Upgraded with RSS and better Google handling) ---
     def scan_competitor_failures(self):
@@ -705,40 +1271,52 @@ class HeadshotAgent:
 
         # 1. Scan RSS Feeds
         for feed_name, feed_url in self.competitor_news_rss_feeds.items():
-            logger.info(f"COMPETITOR_NEWS_RSS :: Checking feed: {feed_name} ({feed_url})")
-            try:
-                parsed_feed = feedparser.parse(feed_url)
-                for entry in parsed_feed.entries[:20]: # Check last 20 entries
-                    title = entry.get("title", "")
-                    summary = entry.get("summary", "")
-                    link = entry.get("link", "")
-                    content_text = f"{title} {summary}"
-
-                    for company_profile_name, profile in COMPANY_PROFILES.items():
-                        for competitor in profile.get("competitor_names", []):
-                            if competitor.lower() in content_text.lower():
-                                for fail_kw in ["fail", "issue", "problem", "cqc", "inadequate", "measures", "terminate", "breach", "scandal"]:
-                                    if fail_kw in content_text.lower():
-                                        logger.info(f"COMPETITOR_RSS_HIT :: Competitor '{competitor}' mentioned with '{fail_kw}' in RSS feed '{feed_name}' for {company_profile_name}")
-                                        opp = self.extract_headshot_opportunity(
-                                            self._get_clean_text(BeautifulSoup(entry.get("content", [{}])[0].get("value", summary), 'html.parser')), # Try to get full content
-                                            company_profile_name,
-                                            f"Competitor Issue (RSS: {feed_name}): {competitor}",
-                                            link,
-                                            buyer_name_hint=None # Buyer usually unknown from general news
-                                        )
-                                        if opp:
-                                            opp["status"] = "competitor_failure_rss"
-                                            opp["headshot_score"] = min(100, opp.get("headshot_score",0) + 20) # Boost for RSS hits
-                                            if opp["headshot_score"] >= 60:
-                                                self.db.save_opportunity(opp)
-                                                discovered_opportunities.append(opp)
-                                        break # Found a failure keyword for this competitor
-            except Exception as e:
-                logger.error(f"COMPETITOR_RSS_ERROR :: Failed to parse RSS feed {feed_url}: {e}")
+            discovered_opportunities.extend(self._scan_competitor_rss_feed(feed_name, feed_url))
             time.sleep(random.uniform(3,7)) # Delay between RSS feeds
 
-        # 2. Scan Google News (VERY BRITTLE, use with caution, expect 429s)
+        # 2. Scan Google News
+        discovered_opportunities.extend(self._scan_competitor_google_news())
+        logger.info(f"Competitor failure scan complete. Discovered {len(discovered_opportunities)} potential opportunities.")
+        return discovered_opportunities
+
+    def _scan_competitor_rss_feed(self, feed_name, feed_url):
+        discovered_opportunities = []
+        logger.info(f"COMPETITOR_NEWS_RSS :: Checking feed: {feed_name} ({feed_url})")
+        try:
+            parsed_feed = feedparser.parse(feed_url)
+            for entry in parsed_feed.entries[:20]: # Check last 20 entries
+                title = entry.get("title", "")
+                summary = entry.get("summary", "")
+                link = entry.get("link", "")
+                content_text = f"{title} {summary}"
+
+                for company_profile_name, profile in COMPANY_PROFILES.items():
+                    for competitor in profile.get("competitor_names", []):
+                        if competitor.lower() in content_text.lower():
+                            for fail_kw in ["fail", "issue", "problem", "cqc", "inadequate", "measures", "terminate", "breach", "scandal"]:
+                                if fail_kw in content_text.lower():
+                                    logger.info(f"COMPETITOR_RSS_HIT :: Competitor '{competitor}' mentioned with '{fail_kw}' in RSS feed '{feed_name}' for {company_profile_name}")
+                                    opp = self.extract_headshot_opportunity(
+                                        self._get_clean_text(BeautifulSoup(entry.get("content", [{}])[0].get("value", summary), 'html.parser')), # Try to get full content
+                                        company_profile_name,
+                                        f"Competitor Issue (RSS: {feed_name}): {competitor}",
+                                        link,
+                                        buyer_name_hint=None # Buyer usually unknown from general news
+                                    )
+                                    if opp:
+                                        opp["status"] = "competitor_failure_rss"
+                                        opp["headshot_score"] = min(100, opp.get("headshot_score",0) + 20) # Boost for RSS hits
+                                        if opp["headshot_score"] >= 60:
+                                            self.db.save_opportunity(opp)
+                                            discovered_opportunities.append(opp)
+                                    break # Found a failure keyword for this competitor
+        except Exception as e:
+            logger.error(f"COMPETITOR_RSS_ERROR :: Failed to parse RSS feed {feed_url}: {e}")
+        return discovered_opportunities
+
+    def _scan_competitor_google_news(self):
+        discovered_opportunities = []
+        # VERY BRITTLE, use with caution, expect 429s. Runs as a single task: its long per-query delays must stay serial.
         logger.info("COMPETITOR_NEWS_GOOGLE :: Attempting Google News scan (highly rate-limited and fragile).")
         for company_profile_name, profile in COMPANY_PROFILES.items():
             for competitor in profile.get("competitor_names", []):
@@ -818,7 +1396,6 @@ class HeadshotAgent:
                                         if opp["headshot_score"] >= 65:
                                             self.db.save_opportunity(opp)
                                             discovered_opportunities.append(opp)
-        logger.info(f"Competitor failure scan complete. Discovered {len(discovered_opportunities)} potential opportunities.")
         return discovered_opportunities
 
     # --- monitor_contract_award_notices (MAJOR REWRITE TO SIMULATE API USAGE) ---
@@ -995,25 +1572,39 @@ class HeadshotAgent:
     def run_headshot_scan(self):
         logger.info("🎯 ADVANCED HEADSHOT SCAN INITIATED 🎯")
         all_opportunities_discovered_count = 0 # Track count from direct scans
-
-        # Use ThreadPoolExecutor for I/O-bound scanning tasks
-        with ThreadPoolExecutor(max_workers=4) as executor: # Reduced workers slightly
-            future_to_scan = {
-                executor.submit(self.scan_local_authorities): "Local Authorities",
-                executor.submit(self.scan_nhs_commissioners): "NHS Commissioners",
-                executor.submit(self.scan_housing_associations): "Housing Associations",
-                executor.submit(self.scan_premium_frameworks): "Premium Frameworks",
-                executor.submit(self.scan_competitor_failures): "Competitor Failures (RSS/Google)"
-            }
-            for future in as_completed(future_to_scan):
-                scan_name = future_to_scan[future]
+        load_url_cache() # Validators (ETag/Last-Modified) from the previous run
+        self.path_cache.load() # Which procurement paths worked / 404'd on earlier runs
+        self.fingerprints.load() # Near-duplicate detection against pages analysed on earlier runs
+        prefetch_robots(target["url"] for target in self.local_authority_targets + self.nhs_targets +
+                        self.housing_association_targets + self.premium_sources)
+
+        # One task per (site, path) plus one per competitor RSS feed, so throughput scales with the number of targets.
+        # host_limiter (in request_with_retry) keeps any one host at MAX_REQUESTS_PER_HOST in flight.
+        tasks = [("Competitor Failures (Google)", self._scan_competitor_google_news, {})] # Longest task: start it first
+        tasks.extend(("Competitor Failures (RSS)", self._scan_competitor_rss_feed, {"feed_name": feed_name, "feed_url": feed_url})
+                     for feed_name, feed_url in self.competitor_news_rss_feeds.items())
+        tasks.extend((category, self._scan_website_for_links, kwargs) for category, kwargs in self._site_scan_tasks())
+        category_counts = defaultdict(lambda: {"tasks": 0, "failed": 0, "opportunities": 0})
+        scan_started = time.time()
+        logger.info(f"SCAN_SCHEDULE :: {len(tasks)} tasks across {HEADSHOT_SCAN_WORKERS} workers.")
+        with ThreadPoolExecutor(max_workers=HEADSHOT_SCAN_WORKERS) as executor:
+            future_to_task = {executor.submit(func, **kwargs): (category, kwargs) for category, func, kwargs in tasks}
+            for future in as_completed(future_to_task):
+                category, kwargs = future_to_task[future]
+                counts = category_counts[category]
+                counts["tasks"] += 1
                 try:
                     results = future.result() # List of opportunities
                     if results: # It should return a list
+                        counts["opportunities"] += len(results)
                         all_opportunities_discovered_count += len(results)
-                    logger.info(f"SCAN_COMPLETE :: {scan_name} scan finished, found {len(results) if results else 0} direct opportunities.")
                 except Exception as e:
-                    logger.error(f"SCAN_TASK_ERROR :: Error in {scan_name} scan: {e}", exc_info=True) # exc_info for traceback
+                    counts["failed"] += 1
+                    target = kwargs.get("base_url") or kwargs.get("feed_url", "")
+                    logger.error(f"SCAN_TASK_ERROR :: Error in {category} scan of {target} {kwargs.get('path_suffixes', '')}: {e}", exc_info=True) # exc_info for traceback
+        for category, counts in category_counts.items():
+            logger.info(f"SCAN_COMPLETE :: {category}: {counts['tasks']} tasks ({counts['failed']} failed), found {counts['opportunities']} direct opportunities.")
+        logger.info(f"SCAN_SCHEDULE :: All {len(tasks)} tasks finished in {time.time() - scan_started:.1f}s.")
 
         # Sequential: Contract Award Monitoring and Pattern Analysis (uses API sim)
         try:
@@ -1028,6 +1619,20 @@ class HeadshotAgent:
         # Notifications and Export
         self.send_headshot_notifications()
         self.db.export_opportunities_csv()
+        save_url_cache()
+        save_robots_cache()
+        circuit_breaker.save()
+        self.path_cache.save()
+        self.fingerprints.save()
+        log_pool_stats("HEADSHOT")
+        self.path_cache.log_stats()
+        self.fingerprints.log_stats()
+        if self._entity_extractor: # Only if some page needed entities (and so loaded the model)
+            self._entity_extractor.close()
+            self._entity_extractor.log_stats()
+        stats = self.page_cache_stats
+        logger.info(f"PAGE_CACHE :: {stats['fetched']} pages fetched and parsed, {stats['reused']} reused; "
+                    f"spaCy ran {stats['nlp_runs']} times, reused {stats['nlp_reused']} times.")
 
         logger.info(f"🎯 ADVANCED HEADSHOT SCAN COMPLETE. Initial direct discoveries: {all_opportunities_discovered_count}.")
         # Note: total impact includes predicted opps, strategic intel, etc., visible in DB/notifications.
@@ -1058,13 +1663,33 @@ COMPANY_PROFILES_TARGETS_CONFIG = {
 }
 
 
+def _benchmark_texts(db, count):
+    """Stored opportunity descriptions as sample pages, topped up with profile text if the vault is small."""
+    rows = db._execute_query('SELECT title, description FROM opportunities ORDER BY discovery_date DESC LIMIT ?', (count,), fetch_all=True) or []
+    texts = [f"{row['title']}. {row['description']}" for row in rows]
+    filler = [f"{profile['name']} seeks {service} contracts with {sector} in {place}. " * 20
+              for profile in COMPANY_PROFILES.values()
+              for service, sector, place in zip(profile["services"], profile["target_sectors"] * 3, profile["geographic_focus"] * 3)]
+    while filler and len(texts) < count:
+        texts.append(filler[len(texts) % len(filler)])
+    return texts
+
+
 def main():
-    if NLP_MODEL is None:
-        logger.critical("CRITICAL: SpaCy NLP model failed to load. Key functionalities will be impaired. Please run 'python -m spacy download en_core_web_sm'")
-        # Decide if you want to exit or continue with reduced functionality
-        # return # Exit if NLP is absolutely critical
-    
+    parser = argparse.ArgumentParser(description="Headshot opportunity scan")
+    parser.add_argument("--benchmark-nlp", type=int, metavar="DOCS", nargs="?", const=200,
+                        help="Measure spaCy entity-extraction throughput (docs/s) on DOCS sample pages instead of scanning")
+    args = parser.parse_args()
+
+    # The spaCy model is loaded on the first page that needs entities (see get_nlp_model)
     agent = HeadshotAgent()
+    if args.benchmark_nlp:
+        texts = _benchmark_texts(agent.db, args.benchmark_nlp)
+        benchmark_nlp_loading(texts)
+        nlp = get_nlp_model()
+        if nlp is not None:
+            benchmark_entity_extraction(nlp, texts)
+        return
     agent.run_headshot_scan()
 
 if __name__ == "__main__":
@@ -0,0 +1,590 @@
+# http_client.py
+"""
+Shared HTTP client factory for AutoRevenue Enterprise Intelligence.
+Every scanner gets its requests.Session from here, so keep-alive connections
+are pooled per host and reused across scanners instead of being re-opened per call.
+Also provides the record/replay cassette used for offline runs and benchmarks
+(AUTOREVENUE_HTTP_CASSETTE=record|replay).
+"""
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from config import (
+    USER_AGENT, HTTP_POOL_MAX_HOSTS, HTTP_POOL_MAXSIZE_PER_HOST,
+    HTTP_CASSETTE_MODE, HTTP_CASSETTE_DIR, HTTP_CASSETTE_VOLATILE_PARAMS,
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD, CIRCUIT_BREAKER_STATE_FILE, CIRCUIT_BREAKER_PROBE_WAIT_SECONDS,
+    DNS_CACHE_ENABLED, DNS_CACHE_TTL_SECONDS, DNS_NEGATIVE_CACHE_TTL_SECONDS,
+    MAX_RESPONSE_BYTES, PARSEABLE_CONTENT_TYPES
+)
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ("record", "replay")
+
+
+# --- Record/replay cassette ---
+# Layout on disk:
+#   <dir>/objects/<sha[:2]>/<sha>.gz   gzip-compressed response bodies, addressed by SHA-256 of the body
+#   <dir>/requests/<key>.json          status, headers and body address per request (method + URL + body)
+# Identical bodies (e.g. the same page reached through several paths) are stored once.
+# The key leaves out HTTP_CASSETTE_VOLATILE_PARAMS, so a replay matches the recording even though
+# its watermarks and look-back windows differ.
+class CassetteStore:
+    """Compressed, content-addressed store of recorded HTTP responses."""
+    # Dropped on record: the stored body is already decoded and de-chunked
+    _HOP_HEADERS = ("content-encoding", "transfer-encoding", "content-length", "connection", "keep-alive")
+
+    def __init__(self, cassette_dir: str):
+        self.cassette_dir = cassette_dir
+        self.objects_dir = os.path.join(cassette_dir, "objects")
+        self.requests_dir = os.path.join(cassette_dir, "requests")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.requests_dir, exist_ok=True)
+
+    @staticmethod
+    def stable_url(url: str) -> str:
+        """The URL without its volatile query parameters."""
+        parsed = urlparse(url)
+        query = parse_qsl(parsed.query, keep_blank_values=True)
+        stable_query = [(k, v) for k, v in query if k not in HTTP_CASSETTE_VOLATILE_PARAMS]
+        if len(stable_query) == len(query):
+            return url
+        return urlunparse(parsed._replace(query=urlencode(stable_query)))
+
+    @staticmethod
+    def request_key(request: requests.PreparedRequest) -> str:
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        digest = hashlib.sha256(f"{request.method} {CassetteStore.stable_url(request.url)}\n".encode("utf-8"))
+        digest.update(body)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _object_path(self, body_sha: str) -> str:
+        return os.path.join(self.objects_dir, body_sha[:2], f"{body_sha}.gz")
+
+    def save_response(self, key: str, request: requests.PreparedRequest, response: requests.Response,
+                      max_bytes: int = MAX_RESPONSE_BYTES):
+        """
+        Records the response, reading its body for the caller. A body over max_bytes is not stored
+        (nor read past max_bytes + 1): the entry keeps its length instead, so guarded_download aborts
+        the replayed response just as it aborts the live one.
+        """
+        declared = _declared_length(response)
+        oversized_length = declared if declared is not None and declared > max_bytes else None
+        body = b""
+        if oversized_length is None: # Otherwise left unread; the caller's guard drops it after the headers
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > max_bytes:
+                    break
+            body = b"".join(chunks)
+            response._content = body
+            response._content_consumed = True
+            if size > max_bytes:
+                response.close()
+                oversized_length = size
+                body = b""
+        body_sha = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(body_sha)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            self._write_atomic(object_path, gzip.compress(body))
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in self._HOP_HEADERS}
+        entry = {
+            "method": request.method, "url": request.url,
+            "status": response.status_code, "reason": response.reason,
+            "headers": headers, "body_sha256": body_sha, "recorded_at": time.time()
+        }
+        if oversized_length is not None:
+            entry["oversized_length"] = oversized_length
+        self._save_entry(key, entry)
+
+    def save_error(self, key: str, request: requests.PreparedRequest, error: Exception):
+        self._save_entry(key, {
+            "method": request.method, "url": request.url,
+            "error": type(error).__name__, "message": str(error)[:500], "recorded_at": time.time()
+        })
+
+    def _save_entry(self, key: str, entry: Dict[str, Any]):
+        self._write_atomic(os.path.join(self.requests_dir, f"{key}.json"), json.dumps(entry).encode("utf-8"))
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.requests_dir, f"{key}.json"), "rb") as f:
+                entry = json.loads(f.read())
+            if "body_sha256" in entry:
+                with open(self._object_path(entry["body_sha256"]), "rb") as f:
+                    entry["body"] = gzip.decompress(f.read())
+            return entry
+        except (OSError, ValueError) as e:
+            logger.debug(f"Cassette miss for key {key}: {e}")
+            return None
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Raised in replay for a request the cassette has no entry for. Says nothing about the host."""
+
+
+class CassetteAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that records responses to a CassetteStore, or replays them without network access.
+    Connection errors are recorded too, so a replayed run fails in the same places as the recorded one.
+    """
+    def __init__(self, mode: str, cassette_dir: str, **kwargs):
+        super().__init__(**kwargs)
+        self.mode = mode
+        self.store = CassetteStore(cassette_dir)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = self.store.request_key(request)
+        if self.mode == "replay":
+            entry = self.store.load(key)
+            if entry is None:
+                raise CassetteMiss(
+                    f"CASSETTE_MISS :: No recorded response for {request.method} {request.url}", request=request)
+            if "error" in entry:
+                raise requests.exceptions.ConnectionError(
+                    f"CASSETTE_REPLAYED_ERROR :: {entry['error']}: {entry.get('message', '')}", request=request)
+            return self._build_replayed_response(request, entry)
+
+        try:
+            response = super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        except requests.exceptions.RequestException as e:
+            self.store.save_error(key, request, e)
+            raise
+        self.store.save_response(key, request, response) # Reads the body (up to the cap), so the caller gets it preloaded
+        return response
+
+    def _build_replayed_response(self, request, entry: Dict[str, Any]) -> requests.Response:
+        body = entry.get("body", b"")
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry.get("reason")
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response.headers["Content-Length"] = str(entry.get("oversized_length", len(body)))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(body)
+        response._content = body
+        response._content_consumed = True # iter_content() then serves the preloaded body
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+def is_cassette_mode() -> bool:
+    """True when responses are recorded to or replayed from the cassette."""
+    return HTTP_CASSETTE_MODE in CASSETTE_MODES
+
+
+def is_replay_mode() -> bool:
+    """True when responses are served from the cassette. Politeness and backoff waits can be skipped."""
+    return HTTP_CASSETTE_MODE == "replay"
+
+
+# --- DNS resolution cache ---
+class DNSCache:
+    """
+    Process-wide cache in front of socket.getaddrinfo (which urllib3 calls for every new connection).
+    Successful lookups are reused for `ttl` seconds. A host that fails to resolve is remembered for
+    `negative_ttl` seconds and fails immediately for any port, without another lookup.
+    """
+    def __init__(self, ttl: float = DNS_CACHE_TTL_SECONDS, negative_ttl: float = DNS_NEGATIVE_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._resolved: Dict[tuple, tuple] = {} # getaddrinfo args -> (expires_at, result)
+        self._failed: Dict[str, tuple] = {} # host -> (expires_at, gaierror)
+        self._lock = threading.Lock()
+        self._original_getaddrinfo = socket.getaddrinfo
+        self._installed = False
+        self.stats = {"hits": 0, "negative_hits": 0, "lookups": 0, "failures": 0, "lookup_seconds": 0.0}
+
+    def install(self):
+        """Routes every getaddrinfo call in the process through the cache."""
+        with self._lock:
+            if not self._installed:
+                self._original_getaddrinfo = socket.getaddrinfo
+                socket.getaddrinfo = self.getaddrinfo
+                self._installed = True
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        host_key = host.lower() if isinstance(host, str) else host
+        now = time.monotonic()
+        with self._lock:
+            failed = self._failed.get(host_key)
+            if failed and failed[0] > now:
+                self.stats["negative_hits"] += 1
+                raise socket.gaierror(*failed[1].args)
+            resolved = self._resolved.get(key)
+            if resolved and resolved[0] > now:
+                self.stats["hits"] += 1
+                return list(resolved[1])
+
+        start = time.monotonic()
+        try:
+            result = self._original_getaddrinfo(host, port, family, type, proto, flags)
+        except socket.gaierror as e:
+            with self._lock:
+                self.stats["lookups"] += 1
+                self.stats["failures"] += 1
+                self.stats["lookup_seconds"] += time.monotonic() - start
+                self._failed[host_key] = (time.monotonic() + self.negative_ttl, e)
+            raise
+        with self._lock:
+            self.stats["lookups"] += 1
+            self.stats["lookup_seconds"] += time.monotonic() - start
+            self._resolved[key] = (time.monotonic() + self.ttl, tuple(result))
+            self._failed.pop(host_key, None)
+        return result
+
+    def host_resolves(self, url_or_host: str) -> bool:
+        """
+        Fast check that a URL's host resolves, answered from the cache when possible.
+        Lets callers skip every path of a host whose DNS is broken after a single lookup.
+        """
+        host = urlparse(url_or_host).hostname if "://" in url_or_host else url_or_host
+        if not host:
+            return False
+        try:
+            self.getaddrinfo(host, 443, 0, socket.SOCK_STREAM)
+            return True
+        except (socket.gaierror, UnicodeError):
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["avg_lookup_ms"] = 1000 * stats["lookup_seconds"] / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
+
+dns_cache = DNSCache()
+
+def host_resolves(url_or_host: str) -> bool:
+    """True if the host resolves (always True in cassette replay, where no lookup is needed)."""
+    if is_replay_mode():
+        return True
+    return dns_cache.host_resolves(url_or_host)
+
+
+# --- Download guards ---
+# Requests are sent with stream=True so the body stays on the socket until the headers have been
+# checked: bodies we can't parse (PDFs, images, ...) or that declare more than MAX_RESPONSE_BYTES
+# are dropped without downloading, and bodies that turn out too large are cut off at the cap.
+_download_stats = {"aborted": 0, "bytes_skipped": 0, "bytes_discarded": 0}
+_download_stats_lock = threading.Lock()
+
+def is_parseable_content_type(content_type: Optional[str]) -> bool:
+    """True for the text/markup/JSON types the scanners parse. A missing Content-Type is given the benefit of the doubt."""
+    if not content_type:
+        return True
+    mime = content_type.split(";", 1)[0].strip().lower()
+    return mime in PARSEABLE_CONTENT_TYPES or mime.endswith("+xml") or mime.endswith("+json")
+
+def _declared_length(response: requests.Response) -> Optional[int]:
+    try:
+        return int(response.headers.get("Content-Length"))
+    except (TypeError, ValueError):
+        return None
+
+def _abort_download(response: requests.Response, url: str, reason: str, bytes_read: int = 0):
+    declared = _declared_length(response)
+    skipped = max(0, declared - bytes_read) if declared is not None else 0
+    with _download_stats_lock:
+        _download_stats["aborted"] += 1
+        _download_stats["bytes_skipped"] += skipped
+        _download_stats["bytes_discarded"] += bytes_read
+    response.close() # Drops the connection rather than draining the rest of the body
+    logger.info(f"DOWNLOAD_ABORTED :: {url} :: {reason}")
+
+def guarded_download(response: requests.Response, url: str, stream_body: bool = False,
+                     max_bytes: int = MAX_RESPONSE_BYTES) -> bool:
+    """
+    Checks a response sent with stream=True before its body is used. Returns False (and closes the
+    response) if its Content-Type is not parseable or it is larger than max_bytes.
+    With stream_body=True only the headers are checked and the body is left for the caller to stream;
+    otherwise the body is read in chunks up to max_bytes and then available as response.content/.text.
+    """
+    content_type = response.headers.get("Content-Type")
+    if not is_parseable_content_type(content_type):
+        _abort_download(response, url, f"unparseable Content-Type {content_type}")
+        return False
+    declared = _declared_length(response)
+    if declared is not None and declared > max_bytes:
+        _abort_download(response, url, f"Content-Length {declared} exceeds {max_bytes} bytes")
+        return False
+    if stream_body:
+        return True
+
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        size += len(chunk)
+        if size > max_bytes:
+            _abort_download(response, url, f"body exceeds {max_bytes} bytes", bytes_read=size)
+            return False
+        chunks.append(chunk)
+    response._content = b"".join(chunks) # What requests itself does when reading .content
+    response._content_consumed = True
+    return True
+
+def get_download_stats() -> Dict[str, int]:
+    with _download_stats_lock:
+        return dict(_download_stats)
+
+
+# One adapter (and therefore one urllib3 PoolManager) is shared by every session the factory
+# hands out. Sessions keep their own headers and cookies but draw connections from the same pools.
+_adapter: Optional[HTTPAdapter] = None
+_shared_session: Optional[requests.Session] = None
+_factory_lock = threading.Lock()
+
+
+def _get_adapter() -> HTTPAdapter:
+    global _adapter
+    with _factory_lock:
+        if _adapter is None:
+            if DNS_CACHE_ENABLED:
+                dns_cache.install()
+            pool_kwargs = {
+                "pool_connections": HTTP_POOL_MAX_HOSTS,      # Number of per-host pools kept alive
+                "pool_maxsize": HTTP_POOL_MAXSIZE_PER_HOST    # Keep-alive connections kept per host
+            }
+            if is_cassette_mode():
+                logger.info(f"HTTP cassette mode '{HTTP_CASSETTE_MODE}' using {HTTP_CASSETTE_DIR}")
+                _adapter = CassetteAdapter(HTTP_CASSETTE_MODE, HTTP_CASSETTE_DIR, **pool_kwargs)
+            else:
+                if HTTP_CASSETTE_MODE:
+                    logger.warning(f"Unknown HTTP cassette mode '{HTTP_CASSETTE_MODE}'. Using live network.")
+                _adapter = HTTPAdapter(**pool_kwargs)
+        return _adapter
+
+
+def create_session(user_agent: str = USER_AGENT, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    Returns a new Session with its own headers/cookies that uses the shared connection pool.
+    """
+    session = requests.Session()
+    adapter = _get_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": user_agent})
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_shared_session() -> requests.Session:
+    """
+    Returns the process-wide Session used by utils.respectful_request and robots.txt fetches.
+    """
+    global _shared_session
+    if _shared_session is None:
+        session = create_session()
+        with _factory_lock:
+            if _shared_session is None:
+                _shared_session = session
+    return _shared_session
+
+
+def get_pool_stats() -> Dict[str, int]:
+    """
+    Reports connection reuse across all pooled hosts.
+    `connections_created` counts new TCP/TLS connections and `connections_reused` counts requests
+    that went out on an already-open keep-alive connection.
+    """
+    stats = {"hosts": 0, "requests": 0, "connections_created": 0, "connections_reused": 0}
+    if _adapter is None:
+        return stats
+    pools = _adapter.poolmanager.pools
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None:  # Evicted between keys() and get()
+            continue
+        stats["hosts"] += 1
+        stats["requests"] += pool.num_requests
+        stats["connections_created"] += pool.num_connections
+    stats["connections_reused"] = max(0, stats["requests"] - stats["connections_created"])
+    return stats
+
+
+def log_pool_stats(label: str = "HTTP"):
+    """Logs the current connection reuse figures."""
+    stats = get_pool_stats()
+    logger.info(
+        f"{label} connection pool: {stats['requests']} requests over {stats['hosts']} hosts, "
+        f"{stats['connections_created']} connections created, {stats['connections_reused']} reused."
+    )
+    downloads = get_download_stats()
+    if downloads["aborted"]:
+        logger.info(
+            f"{label} download guards: {downloads['aborted']} responses aborted, "
+            f"{downloads['bytes_skipped']} bytes never downloaded, {downloads['bytes_discarded']} bytes read and discarded."
+        )
+    dns = dns_cache.get_stats()
+    logger.info(
+        f"{label} DNS cache: {dns['hits']} hits, {dns['negative_hits']} negative hits, {dns['lookups']} lookups "
+        f"({dns['failures']} failed, avg {dns['avg_lookup_ms']:.1f} ms)."
+    )
+
+
+# --- Per-host circuit breaker ---
+class HostCircuitBreaker:
+    """
+    Fails fast on hosts that cannot be reached.
+    After `failure_threshold` consecutive connection/DNS failures a host is "open" and its remaining
+    URLs are skipped for the rest of the run. Open hosts are saved to `state_file`; on the next run
+    they start "half_open": the first request is let through as a probe (others to that host wait for
+    its result), and the host closes again if it succeeds or stays open if it fails.
+    HTTP error statuses count as successes here, since the host answered.
+    """
+    def __init__(self, state_file: str = CIRCUIT_BREAKER_STATE_FILE,
+                 failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        self.state_file = state_file
+        self.failure_threshold = max(1, failure_threshold)
+        self._hosts: Dict[str, Dict[str, Any]] = {} # host -> {"state", "failures", "opened_at", "last_error"}
+        self._probes: Dict[str, threading.Event] = {} # host -> set when its half-open probe finishes
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.skipped = 0
+
+    @staticmethod
+    def is_connection_failure(error: Exception) -> bool:
+        """True for errors that mean the host could not be reached (DNS, refused, connect timeout)."""
+        if isinstance(error, requests.exceptions.SSLError):
+            return False # The host answered; its certificate is the problem
+        return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout))
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.state_file, "r") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"Error reading circuit breaker state {self.state_file}: {e}. Starting with all hosts closed.")
+            return
+        for host, entry in stored.items():
+            if entry.get("state") == "open":
+                self._hosts[host] = dict(entry, state="half_open", failures=0)
+        if self._hosts:
+            logger.info(f"Circuit breaker: {len(self._hosts)} hosts open last run will be probed once before crawling.")
+
+    def allow_request(self, url: str) -> bool:
+        """False if the URL's host is open. For a half-open host, the first caller becomes the probe."""
+        host = urlparse(url).netloc.lower()
+        while True:
+            with self._lock:
+                self._ensure_loaded()
+                entry = self._hosts.get(host)
+                if entry is None or entry["state"] == "closed":
+                    return True
+                if entry["state"] == "open":
+                    self.skipped += 1
+                    return False
+                probe = self._probes.get(host)
+                if probe is None: # half_open, no probe yet: this request is it
+                    self._probes[host] = threading.Event()
+                    logger.info(f"CIRCUIT_PROBE :: {host} was unreachable last run. Probing with {url}")
+                    return True
+            if not probe.wait(CIRCUIT_BREAKER_PROBE_WAIT_SECONDS):
+                with self._lock:
+                    self.skipped += 1
+                return False # Probe still hanging; don't pile more requests onto the host
+
+    def record_success(self, url: str):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                return
+            if entry["state"] != "closed":
+                logger.info(f"CIRCUIT_CLOSED :: {host} reachable again.")
+            self._hosts[host] = {"state": "closed", "failures": 0}
+            probe = self._probes.pop(host, None)
+        if probe:
+            probe.set()
+
+    def record_failure(self, url: str, error: Exception) -> bool:
+        """
+        Counts a connection/DNS failure for the URL's host. Returns True if the host is now open.
+        Other request errors (read timeouts, SSL, ...) mean the host was reached and count as a success.
+        A cassette miss counts as neither: the host was never contacted.
+        """
+        if isinstance(error, CassetteMiss):
+            return False
+        if not self.is_connection_failure(error):
+            self.record_success(url)
+            return False
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._hosts.setdefault(host, {"state": "closed", "failures": 0})
+            entry["failures"] = entry.get("failures", 0) + 1
+            entry["last_error"] = f"{type(error).__name__}: {str(error)[:200]}"
+            was_probe = entry["state"] == "half_open"
+            opened = was_probe or (entry["state"] == "closed" and entry["failures"] >= self.failure_threshold)
+            if opened:
+                entry["state"] = "open"
+                entry["opened_at"] = time.time()
+                reason = "probe failed" if was_probe else f"{entry['failures']} consecutive connection failures"
+                logger.warning(f"CIRCUIT_OPEN :: {host} ({reason}). Skipping its remaining URLs this run. "
+                               f"Last error: {entry['last_error']}")
+            now_open = entry["state"] == "open"
+            probe = self._probes.pop(host, None) if opened else None
+        if probe:
+            probe.set()
+        return now_open
+
+    def is_open(self, url: str) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._hosts.get(urlparse(url).netloc.lower())
+        return bool(entry) and entry["state"] == "open"
+
+    def save(self):
+        """Persists the hosts that are open (half-open hosts that were never probed stay open)."""
+        with self._lock:
+            if not self._loaded:
+                return
+            snapshot = {host: dict(entry, state="open") for host, entry in self._hosts.items()
+                        if entry["state"] in ("open", "half_open")}
+            skipped = self.skipped
+        try:
+            with open(self.state_file, "w") as f:
+                json.dump(snapshot, f, indent=4)
+        except IOError:
+            logger.error(f"Could not write circuit breaker state {self.state_file}")
+        if snapshot or skipped:
+            logger.info(f"Circuit breaker: {len(snapshot)} hosts open, {skipped} requests skipped this run.")
+
+# Shared by every request path (utils.respectful_request, HeadshotAgent.request_with_retry)
+circuit_breaker = HostCircuitBreaker()
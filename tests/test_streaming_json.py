@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from utils import StreamingJSONArray
+
+
+def _chunked(body, size):
+    return [body[i:i + size].encode("utf-8") for i in range(0, len(body), size)]
+
+
+def _decode(body, size, key="releases"):
+    stream = StreamingJSONArray(_chunked(body, size), key)
+    return list(stream), stream.metadata
+
+
+BODY = json.dumps({
+    "uri": "https://example.org/package",
+    "releases": [4.5, -12.75e3, 1234567, "split \"string\" ]}, value", {"id": "a", "amount": 99.01}, [1.5, 2], True, None],
+    "max_pg": 4,
+})
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64])
+def test_chunk_boundaries_inside_numbers_and_strings(size):
+    items, metadata = _decode(BODY, size)
+    expected = json.loads(BODY)
+    assert items == expected["releases"]
+    assert metadata == {"uri": expected["uri"], "max_pg": 4}
+
+
+def test_number_split_after_decimal_point():
+    stream = StreamingJSONArray([b'{"releases": [4.', b'5, 10', b'0]}'], "releases")
+    assert list(stream) == [4.5, 100]
+
+
+def test_nested_key_with_same_name_is_not_streamed():
+    items, metadata = _decode('{"publisher":{"releases":[9]},"releases":[1]}', 4)
+    assert items == [1]
+    assert metadata == {"publisher": {"releases": [9]}}
+
+
+def test_truncated_array_raises():
+    with pytest.raises(json.JSONDecodeError):
+        _decode('{"releases": [1, 2.5', 3)
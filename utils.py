@@ -3,56 +3,155 @@
 Utility functions for AutoRevenue Enterprise Intelligence.
 Includes robots.txt parsing and other common helpers.
 """
+import json
+import codecs
 import time
+import asyncio
+import threading
 import requests
 import logging
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Tuple
 from urllib.robotparser import RobotFileParser
 from urllib.parse import urlparse, urljoin
 
-from config import USER_AGENT, REQUEST_DELAY_SECONDS
+from config import (
+    USER_AGENT, REQUEST_DELAY_SECONDS, MAX_CONCURRENT_SCRAPERS, MAX_REQUESTS_PER_HOST,
+    ROBOTS_CACHE_FILE_PATH, ROBOTS_CACHE_TTL_HOURS, ROBOTS_NEGATIVE_CACHE_TTL_HOURS, ROBOTS_PREFETCH_WORKERS
+)
+from http_client import get_shared_session, is_replay_mode, circuit_breaker, host_resolves, guarded_download
 
 logger = logging.getLogger(__name__)
 
 # Cache for robots.txt parsers to avoid re-fetching and re-parsing
 _robot_parsers_cache = {}
 
+# Persistent robots.txt rules, keyed by base URL:
+#   {"status": "ok" | "allow_all" | "unavailable", "lines": [...], "expires_at": <unix time>}
+# "allow_all" covers 4xx and network errors, "unavailable" covers 5xx (no parser, requests allowed).
+_robots_store: Dict[str, Dict] = {}
+_robots_store_loaded = False
+_robots_lock = threading.Lock()
+_robots_host_locks: Dict[str, threading.Lock] = {} # One fetch per host even when many threads ask at once
+
+def load_robots_cache():
+    """Loads persisted robots.txt rules, dropping expired entries."""
+    global _robots_store, _robots_store_loaded
+    now = time.time()
+    try:
+        with open(ROBOTS_CACHE_FILE_PATH, 'r') as f:
+            stored = json.load(f)
+        _robots_store = {base_url: entry for base_url, entry in stored.items() if entry.get("expires_at", 0) > now}
+    except FileNotFoundError:
+        _robots_store = {}
+    except (json.JSONDecodeError, AttributeError):
+        logger.error(f"Error decoding robots cache file {ROBOTS_CACHE_FILE_PATH}. Starting with empty cache.")
+        _robots_store = {}
+    _robots_store_loaded = True
+
+def save_robots_cache():
+    with _robots_lock:
+        snapshot = dict(_robots_store)
+    try:
+        with open(ROBOTS_CACHE_FILE_PATH, 'w') as f:
+            json.dump(snapshot, f, indent=4)
+    except IOError:
+        logger.error(f"Could not write to robots cache file {ROBOTS_CACHE_FILE_PATH}")
+
+def _parser_from_entry(robots_url: str, entry: Dict) -> RobotFileParser | None:
+    if entry["status"] == "unavailable":
+        return None
+    parser = RobotFileParser()
+    parser.set_url(robots_url)
+    if entry["status"] == "allow_all":
+        parser.allow_all = True
+    else:
+        parser.parse(entry.get("lines", []))
+    return parser
+
+def _remember_robots(base_url: str, status: str, lines: List[str] | None = None, failed: bool = False):
+    ttl_hours = ROBOTS_NEGATIVE_CACHE_TTL_HOURS if failed else ROBOTS_CACHE_TTL_HOURS
+    with _robots_lock:
+        _robots_store[base_url] = {"status": status, "lines": lines or [], "expires_at": time.time() + ttl_hours * 3600}
+
 def get_robot_parser(base_url: str) -> RobotFileParser | None:
     """
     Fetches and parses the robots.txt file for a given base URL.
-    Caches the parser object.
+    Caches the parser object in memory and the rules on disk (see load_robots_cache).
     """
     if base_url in _robot_parsers_cache:
         return _robot_parsers_cache[base_url]
 
-    robots_url = urljoin(base_url, "/robots.txt")
-    parser = RobotFileParser()
-    parser.set_url(robots_url)
-    try:
-        # It's good practice to have a timeout for fetching robots.txt as well
-        headers = {'User-Agent': USER_AGENT}
-        response = requests.get(robots_url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            parser.parse(response.text.splitlines())
+    with _robots_lock:
+        if not _robots_store_loaded:
+            load_robots_cache()
+        host_lock = _robots_host_locks.setdefault(base_url, threading.Lock())
+
+    with host_lock:
+        if base_url in _robot_parsers_cache: # Fetched by another thread while we waited
+            return _robot_parsers_cache[base_url]
+
+        robots_url = urljoin(base_url, "/robots.txt")
+        entry = _robots_store.get(base_url)
+        if entry and entry.get("expires_at", 0) > time.time():
+            parser = _parser_from_entry(robots_url, entry)
             _robot_parsers_cache[base_url] = parser
-            logger.info(f"Successfully fetched and parsed robots.txt for {base_url}")
+            logger.debug(f"Using cached robots.txt ({entry['status']}) for {base_url}")
             return parser
-        elif 400 <= response.status_code < 500: # Client errors (401, 403, 404)
-             # Assume allow all if robots.txt is missing or inaccessible with client error
-            logger.warning(f"robots.txt for {base_url} returned {response.status_code}. Assuming allow all.")
-            parser.allow_all = True # Default behavior if file not found or access denied
-            _robot_parsers_cache[base_url] = parser # Cache this decision
+
+        parser = RobotFileParser()
+        parser.set_url(robots_url)
+        try:
+            # It's good practice to have a timeout for fetching robots.txt as well
+            headers = {'User-Agent': USER_AGENT}
+            response = get_shared_session().get(robots_url, headers=headers, timeout=10)
+            if response.status_code == 200:
+                lines = response.text.splitlines()
+                parser.parse(lines)
+                _robot_parsers_cache[base_url] = parser
+                _remember_robots(base_url, "ok", lines)
+                logger.info(f"Successfully fetched and parsed robots.txt for {base_url}")
+                return parser
+            elif 400 <= response.status_code < 500: # Client errors (401, 403, 404)
+                 # Assume allow all if robots.txt is missing or inaccessible with client error
+                logger.warning(f"robots.txt for {base_url} returned {response.status_code}. Assuming allow all.")
+                parser.allow_all = True # Default behavior if file not found or access denied
+                _robot_parsers_cache[base_url] = parser # Cache this decision
+                _remember_robots(base_url, "allow_all")
+                return parser
+            else:
+                logger.error(f"Failed to fetch robots.txt for {base_url}: HTTP {response.status_code}")
+                _robot_parsers_cache[base_url] = None # Negative cache: don't re-fetch for every request
+                _remember_robots(base_url, "unavailable", failed=True)
+                return None # Indicate failure to fetch
+        except requests.RequestException as e:
+            logger.error(f"Request error fetching robots.txt for {base_url}: {e}")
+            # In case of network errors, safer to assume disallow or handle carefully
+            # For now, let's assume allow all if robots.txt fetch fails, but log it.
+            # A more conservative approach might be to disallow.
+            parser.allow_all = True 
+            _robot_parsers_cache[base_url] = parser
+            _remember_robots(base_url, "allow_all", failed=True)
             return parser
-        else:
-            logger.error(f"Failed to fetch robots.txt for {base_url}: HTTP {response.status_code}")
-            return None # Indicate failure to fetch
-    except requests.RequestException as e:
-        logger.error(f"Request error fetching robots.txt for {base_url}: {e}")
-        # In case of network errors, safer to assume disallow or handle carefully
-        # For now, let's assume allow all if robots.txt fetch fails, but log it.
-        # A more conservative approach might be to disallow.
-        parser.allow_all = True 
-        _robot_parsers_cache[base_url] = parser
-        return parser
+
+def prefetch_robots(urls: Iterable[str], max_workers: int = ROBOTS_PREFETCH_WORKERS) -> int:
+    """
+    Loads robots.txt for every distinct host in `urls` concurrently, so the first request
+    to each host doesn't pay for it. Returns the number of hosts prefetched.
+    """
+    base_urls = set()
+    for url in urls:
+        parsed_url = urlparse(url or "")
+        if parsed_url.scheme in ("http", "https") and parsed_url.netloc:
+            base_urls.add(f"{parsed_url.scheme}://{parsed_url.netloc}")
+    if not base_urls:
+        return 0
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        list(executor.map(get_robot_parser, base_urls))
+    logger.info(f"Prefetched robots.txt for {len(base_urls)} hosts in {time.monotonic() - start:.2f}s")
+    return len(base_urls)
 
 
 def can_fetch(url: str, user_agent: str = USER_AGENT) -> bool:
@@ -73,26 +172,119 @@ def can_fetch(url: str, user_agent: str = USER_AGENT) -> bool:
     return True
 
 
+def get_crawl_delay(url: str, user_agent: str = USER_AGENT) -> float | None:
+    """
+    Returns the robots.txt Crawl-delay (in seconds) that applies to the URL's host, if any.
+    """
+    parsed_url = urlparse(url)
+    parser = get_robot_parser(f"{parsed_url.scheme}://{parsed_url.netloc}")
+    if not parser:
+        return None
+    delay = parser.crawl_delay(user_agent)
+    return float(delay) if delay is not None else None
+
+
+class HostScheduler:
+    """
+    Per-host politeness scheduler.
+    Tracks the next allowed send time for each host, so a thread only waits for
+    earlier requests to its own host. Requests to different hosts never wait on each other.
+    """
+    def __init__(self, default_delay: float = REQUEST_DELAY_SECONDS):
+        self.default_delay = default_delay
+        self._next_allowed = {}  # host -> time.monotonic() value of the next free slot
+        self._lock = threading.Lock()
+
+    def wait_for_turn(self, url: str, min_delay: float | None = None, user_agent: str = USER_AGENT) -> float:
+        """
+        Blocks until the URL's host may be contacted again and reserves the following slot.
+        The gap between requests to one host is the larger of `min_delay` (default_delay if None)
+        and the host's robots.txt Crawl-delay. Returns the number of seconds waited.
+        """
+        host = urlparse(url).netloc.lower()
+        delay = self.default_delay if min_delay is None else min_delay
+        crawl_delay = get_crawl_delay(url, user_agent)
+        if crawl_delay:
+            delay = max(delay, crawl_delay)
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = slot + delay
+
+        wait = slot - now
+        if is_replay_mode(): # No server to be polite to when replaying a cassette
+            return 0.0
+        if wait > 0:
+            logger.debug(f"Politeness wait of {wait:.2f}s for {host}")
+            time.sleep(wait)
+        return wait
+
+# Shared by every request path so that all callers see the same per-host schedule
+politeness_scheduler = HostScheduler()
+
+
+class HostConcurrencyLimiter:
+    """
+    Caps the number of requests in flight to each host, whichever thread or scanner sends them.
+    HostScheduler spaces out request start times; this bounds how many can overlap when a host is slow.
+    """
+    def __init__(self, max_per_host: int = MAX_REQUESTS_PER_HOST):
+        self.max_per_host = max(1, max_per_host)
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """Holds one of the URL's host slots for the duration of the block."""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.max_per_host))
+        with semaphore:
+            yield
+
+host_limiter = HostConcurrencyLimiter()
+
+
 def respectful_request(method: str, url: str, **kwargs) -> requests.Response | None:
     """
-    Makes an HTTP request if allowed by robots.txt and adds a delay.
+    Makes an HTTP request if allowed by robots.txt, waiting for the host's politeness slot first.
     """
+    if not host_resolves(url): # Cached, so an unresolvable host costs one lookup per negative TTL
+        logger.warning(f"Skipping {url}: host does not resolve.")
+        return None
     if not can_fetch(url, USER_AGENT):
         logger.warning(f"Skipping {url} due to robots.txt restrictions for user-agent {USER_AGENT}.")
         return None
 
-    # Add delay
-    time.sleep(REQUEST_DELAY_SECONDS)
-    
+    if not circuit_breaker.allow_request(url):
+        logger.info(f"Skipping {url}: host unreachable earlier (circuit open).")
+        return None
+
     headers = kwargs.pop('headers', {})
     headers['User-Agent'] = USER_AGENT
+    # Always stream: the body is only read once the download guards have passed.
+    # Callers that asked for stream=True get the body left on the socket for them.
+    stream_body = kwargs.pop('stream', False)
     
     try:
-        response = requests.request(method, url, headers=headers, timeout=15, **kwargs)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4XX or 5XX)
+        with host_limiter.slot(url):
+            # Only waits if this host was contacted less than its delay ago
+            politeness_scheduler.wait_for_turn(url)
+            try:
+                response = get_shared_session().request(method, url, headers=headers, timeout=15, stream=True, **kwargs)
+            except requests.exceptions.RequestException as e:
+                circuit_breaker.record_failure(url, e)
+                raise
+            circuit_breaker.record_success(url)
+            response.raise_for_status()  # Raise HTTPError for bad responses (4XX or 5XX)
+            if response.status_code != 304 and not guarded_download(response, url, stream_body=stream_body):
+                return None
         logger.debug(f"Successfully fetched {url} (status: {response.status_code})")
         return response
     except requests.exceptions.HTTPError as e:
+        if e.response is not None:
+            e.response.close()
         logger.error(f"HTTP error for {url}: {e}")
     except requests.exceptions.ConnectionError as e:
         logger.error(f"Connection error for {url}: {e}")
@@ -102,6 +294,136 @@ def respectful_request(method: str, url: str, **kwargs) -> requests.Response | N
         logger.error(f"General request error for {url}: {e}")
     return None
 
+# --- Async fetch engine ---
+# respectful_request and the scanners' fetch/parse steps are blocking, so the engine runs them
+# on worker threads and bounds the number of calls in flight with a semaphore. robots.txt checks,
+# the User-Agent header, per-host limits and error handling all stay in respectful_request.
+
+async def map_bounded(func: Callable[[Any], Any], items: Iterable[Any],
+                      max_concurrency: int = MAX_CONCURRENT_SCRAPERS) -> AsyncIterator[Tuple[Any, Any]]:
+    """
+    Runs the blocking `func(item)` on worker threads with at most `max_concurrency` calls in flight,
+    yielding (item, result) pairs in completion order. The caller's work on each result runs on the
+    event loop thread while the remaining calls carry on in the background.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(item):
+        async with semaphore:
+            return item, await asyncio.to_thread(func, item)
+
+    for next_done in asyncio.as_completed([run(item) for item in items]):
+        yield await next_done
+
+# --- Streaming JSON decoding ---
+class StreamingJSONArray:
+    """
+    Incrementally decodes one top-level array (e.g. OCDS "releases") from a JSON body that
+    arrives in chunks, yielding its items one at a time. Only the current item and one chunk
+    are held in memory. The other top-level fields (e.g. "max_pg") are available in
+    `metadata` once iteration has finished.
+    """
+    _WHITESPACE = " \t\n\r"
+
+    def __init__(self, chunks: Iterable[bytes | str], array_key: str):
+        self._chunks = iter(chunks)
+        self._array_key = array_key
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._exhausted = False
+        self.metadata: Dict[str, Any] = {}
+
+    def _read_more(self) -> str:
+        for chunk in self._chunks:
+            if chunk:
+                return self._text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        self._exhausted = True
+        return self._text_decoder.decode(b"", final=True)
+
+    def _find_array_start(self, buffer: str, state: Dict[str, Any]) -> int | None:
+        """
+        Scans `buffer` from state["pos"] for the '[' that opens the array_key value of the top-level
+        object (depth 1), ignoring same-named keys in nested objects and anything inside strings.
+        Returns its index, or None if it has not arrived yet (state carries over to the next call).
+        """
+        pos = state["pos"]
+        while pos < len(buffer):
+            char = buffer[pos]
+            if state["in_string"]:
+                if state["escaped"]:
+                    state["escaped"] = False
+                elif char == "\\":
+                    state["escaped"] = True
+                elif char == '"':
+                    state["in_string"] = False
+                    if state["depth"] == 1:
+                        state["last_string"] = buffer[state["string_start"]:pos]
+            elif char == '"':
+                state["in_string"], state["string_start"] = True, pos + 1
+                state["value_key"] = None
+            elif char == ":" and state["depth"] == 1:
+                state["value_key"], state["last_string"] = state["last_string"], None
+            elif char in "[{":
+                if char == "[" and state["depth"] == 1 and state["value_key"] == self._array_key:
+                    return pos
+                state["depth"] += 1
+                state["value_key"] = None
+            elif char in "]}":
+                state["depth"] -= 1
+                state["value_key"] = None
+            elif char not in self._WHITESPACE:
+                state["value_key"], state["last_string"] = None, None
+            pos += 1
+        state["pos"] = pos
+        return None
+
+    def __iter__(self):
+        decoder = json.JSONDecoder()
+
+        # 1. Everything up to the opening bracket of the array is kept for `metadata`
+        buffer = ""
+        start = None
+        state = {"pos": 0, "depth": 0, "in_string": False, "escaped": False,
+                 "string_start": 0, "last_string": None, "value_key": None}
+        while start is None and not self._exhausted:
+            buffer += self._read_more()
+            start = self._find_array_start(buffer, state)
+        if start is None: # No such array: fall back to a plain decode of the whole body
+            self.metadata = json.loads(buffer) if buffer.strip() else {}
+            items = self.metadata.pop(self._array_key, None)
+            yield from items if isinstance(items, list) else []
+            return
+        prefix, buffer = buffer[:start], buffer[start + 1:]
+
+        # 2. Array items, one raw_decode per item. An item only counts as complete once the
+        #    character after it (',' or ']') has arrived, so partial numbers/literals are never taken.
+        while True:
+            pos = 0
+            while pos < len(buffer) and (buffer[pos] in self._WHITESPACE or buffer[pos] == ","):
+                pos += 1
+            buffer = buffer[pos:]
+            if buffer.startswith("]"):
+                break
+            try:
+                item, end = decoder.raw_decode(buffer)
+                # "4." decodes as 4 with "." left over: only a delimiter proves the item is whole
+                complete = buffer[end:].lstrip(self._WHITESPACE)[:1] in (",", "]")
+            except json.JSONDecodeError:
+                complete = False
+            if complete:
+                buffer = buffer[end:]
+                yield item
+                continue
+            if self._exhausted:
+                raise json.JSONDecodeError(f"Truncated '{self._array_key}' array", buffer[:200], 0)
+            buffer += self._read_more()
+
+        # 3. Whatever follows the array completes the top-level object
+        suffix = buffer[1:]
+        while not self._exhausted:
+            suffix += self._read_more()
+        self.metadata = json.loads(prefix + "[]" + suffix)
+        self.metadata.pop(self._array_key, None)
+
 def normalize_text(text: str | None) -> str:
     """
     Normalizes text by converting to lowercase and removing extra whitespace.
@@ -1,5 +1,4 @@
 # 🔍 REAL WEB SCRAPER FOR UK PROCUREMENT AND BUSINESS OPPORTUNITIES
-import requests
 from bs4 import BeautifulSoup
 import re
 import json
@@ -7,12 +6,14 @@ from datetime import datetime, timedelta
 import time
 import random
 
+from http_client import create_session, get_pool_stats
+
 class RealOpportunityScraper:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # Shared keep-alive pool (http_client), so repeated Contracts Finder searches reuse warm connections
+        self.session = create_session(
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        )
         
     def scrape_contracts_finder(self, max_pages=2):
         """Scrape UK Government Contracts Finder"""
@@ -377,6 +378,8 @@ class RealOpportunityScraper:
         print(f"   After deduplication: {len(unique_opportunities)}")
         print(f"   EzziUK opportunities: {len([o for o in unique_opportunities if o['company_match'] == 'EzziUK'])}")
         print(f"   RehabilityUK opportunities: {len([o for o in unique_opportunities if o['company_match'] == 'RehabilityUK'])}")
+        pool_stats = get_pool_stats()
+        print(f"   Connections: {pool_stats['connections_created']} created, {pool_stats['connections_reused']} reused")
         print("=" * 60)
         
         return unique_opportunities